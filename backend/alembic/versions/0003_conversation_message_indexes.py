@@ -0,0 +1,41 @@
+"""conversation and message indexes
+
+Composite indexes for loading a conversation's messages in order and a
+store's recent conversations. On PostgreSQL they are built CONCURRENTLY
+so large tables stay writable during the migration.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 10:05:12.481310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_conversation_id_timestamp', 'messages', ['conversation_id', 'timestamp'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_conversations_store_id_started_at', 'conversations', ['store_id', 'started_at'],
+            unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_conversations_store_id_started_at', table_name='conversations', postgresql_concurrently=True)
+        op.drop_index('ix_messages_conversation_id_timestamp', table_name='messages', postgresql_concurrently=True)
@@ -0,0 +1,54 @@
+"""store public key
+
+Stores.public_key identifies a store in the widget embed code, and the
+widget bootstrap endpoint also looks stores up by store_domain. Existing
+stores get a generated key, and their domains are normalized the way
+the model now stores them ("https://Shop.Example.com/" -> "shop.example.com").
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 10:04:44.224438
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models import generate_public_key, normalize_domain
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('public_key', sa.String(), nullable=True))
+
+    # Backfill before the unique index exists
+    bind = op.get_bind()
+    stores = sa.table('stores', sa.column('id', sa.String()), sa.column('public_key', sa.String()))
+    store_ids = [row.id for row in bind.execute(sa.select(stores.c.id).where(stores.c.public_key.is_(None)))]
+    for store_id in store_ids:
+        bind.execute(stores.update().where(stores.c.id == store_id).values(public_key=generate_public_key()))
+
+    domains = sa.table('stores', sa.column('id', sa.String()), sa.column('store_domain', sa.String()))
+    for row in bind.execute(sa.select(domains.c.id, domains.c.store_domain).where(domains.c.store_domain.isnot(None))).all():
+        normalized = normalize_domain(row.store_domain) if row.store_domain else row.store_domain
+        if normalized != row.store_domain:
+            bind.execute(domains.update().where(domains.c.id == row.id).values(store_domain=normalized))
+
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stores_public_key'), ['public_key'], unique=True)
+        batch_op.create_index(batch_op.f('ix_stores_store_domain'), ['store_domain'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('stores', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stores_store_domain'))
+        batch_op.drop_index(batch_op.f('ix_stores_public_key'))
+        batch_op.drop_column('public_key')
@@ -0,0 +1,340 @@
+"""
+Incremental rollups for the merchant dashboard
+
+The dashboard never scans `messages` or `conversations`. A periodic job
+aggregates everything between the stored watermark and "now minus a
+small lag" into per-store hourly and daily rows, then advances the
+watermark in the same transaction. Each run only touches new data.
+
+- Message counts, tokens and intents are bucketed by message timestamp.
+- Conversation starts are bucketed by started_at. Outcomes (resolved,
+  escalated, rating) are bucketed by ended_at, so a rating counts once
+  the conversation has ended.
+
+Limitation: outcomes are read once, when the window containing ended_at
+is rolled up (ROLLUP_LAG_SECONDS after ended_at at the earliest). A
+status or rating written after that is never counted, and a later change
+is not reflected. Whatever records outcomes must set status and rating
+in the same write as ended_at (e.g. a post-chat rating prompt sets
+ended_at when the rating arrives, not when the chat went quiet).
+
+Run once:         python -m app.analytics
+Run continuously: set ROLLUP_INTERVAL_SECONDS (see lifespan in main.py)
+"""
+import argparse
+import asyncio
+import json
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import (
+    Conversation, Message, RollupWatermark, StoreStatsDaily, StoreStatsHourly, generate_uuid
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+WATERMARK = "store_stats"
+COUNT_FIELDS = (
+    "messages", "user_messages", "assistant_messages", "tokens_used",
+    "conversations_started", "conversations_ended", "resolved", "escalations",
+    "rating_sum", "rating_count",
+)
+
+
+def _hour_bucket(db: Session, column):
+    """SQL expression truncating a timestamp to the hour"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.date_trunc("hour", column)
+    if dialect == "mysql":
+        return func.date_format(column, "%Y-%m-%d %H:00:00")
+    return func.strftime("%Y-%m-%d %H:00:00", column)
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    return _parse_bucket(value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_bucket(value: str) -> datetime:
+    # SQLite/MySQL return the bucket as text; only a few distinct hours per window
+    return datetime.fromisoformat(value)
+
+
+def _day(bucket: datetime) -> datetime:
+    return bucket.replace(hour=0)
+
+
+class _Delta:
+    """Counts to add to one (store, bucket) rollup row"""
+
+    __slots__ = COUNT_FIELDS + ("intents",)
+
+    def __init__(self):
+        for name in COUNT_FIELDS:
+            setattr(self, name, 0)
+        self.intents = Counter()
+
+    def merge(self, other: "_Delta"):
+        for name in COUNT_FIELDS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.intents.update(other.intents)
+
+
+def _aggregate(db: Session, start: datetime, end: datetime) -> dict[tuple[str, datetime], _Delta]:
+    """Hourly deltas for everything in (start, end], computed with GROUP BY in SQL"""
+    deltas = defaultdict(_Delta)
+
+    hour = _hour_bucket(db, Message.timestamp)
+    message_rows = (
+        db.query(
+            Conversation.store_id, hour, Message.role, Message.intent,
+            func.count(Message.id), func.coalesce(func.sum(Message.tokens_used), 0)
+        )
+        .join(Conversation, Conversation.id == Message.conversation_id)
+        .filter(Message.timestamp > start, Message.timestamp <= end)
+        .group_by(Conversation.store_id, hour, Message.role, Message.intent)
+    )
+    for store_id, bucket, role, intent, count, tokens in message_rows:
+        delta = deltas[(store_id, _as_datetime(bucket))]
+        delta.messages += count
+        delta.tokens_used += tokens
+        if role == "user":
+            delta.user_messages += count
+        elif role == "assistant":
+            delta.assistant_messages += count
+        if intent:
+            delta.intents[intent] += count
+
+    hour = _hour_bucket(db, Conversation.started_at)
+    started_rows = (
+        db.query(Conversation.store_id, hour, func.count(Conversation.id))
+        .filter(Conversation.started_at > start, Conversation.started_at <= end)
+        .group_by(Conversation.store_id, hour)
+    )
+    for store_id, bucket, count in started_rows:
+        deltas[(store_id, _as_datetime(bucket))].conversations_started += count
+
+    hour = _hour_bucket(db, Conversation.ended_at)
+    ended_rows = (
+        db.query(
+            Conversation.store_id, hour, func.count(Conversation.id),
+            func.sum(case((Conversation.status == "resolved", 1), else_=0)),
+            func.sum(case((Conversation.status == "escalated", 1), else_=0)),
+            func.coalesce(func.sum(Conversation.rating), 0),
+            func.count(Conversation.rating),
+        )
+        .filter(Conversation.ended_at > start, Conversation.ended_at <= end)
+        .group_by(Conversation.store_id, hour)
+    )
+    for store_id, bucket, count, resolved, escalated, rating_sum, rating_count in ended_rows:
+        delta = deltas[(store_id, _as_datetime(bucket))]
+        delta.conversations_ended += count
+        delta.resolved += resolved or 0
+        delta.escalations += escalated or 0
+        delta.rating_sum += rating_sum
+        delta.rating_count += rating_count
+
+    return deltas
+
+
+def _apply(db: Session, model, deltas: dict[tuple[str, datetime], _Delta]):
+    """Add deltas onto existing rollup rows, creating missing ones (bulk statements)"""
+    if not deltas:
+        return
+    store_ids = {store_id for store_id, _ in deltas}
+    buckets = [bucket for _, bucket in deltas]
+    existing = {
+        (row.store_id, row.bucket_start): row
+        for row in db.execute(
+            select(model.id, model.store_id, model.bucket_start, model.intent_counts,
+                   *(getattr(model, name) for name in COUNT_FIELDS))
+            .where(
+                model.store_id.in_(store_ids),
+                model.bucket_start >= min(buckets),
+                model.bucket_start <= max(buckets),
+            )
+        )
+    }
+
+    inserts = []
+    updates = []
+    for key, delta in deltas.items():
+        row = existing.get(key)
+        values = {
+            name: getattr(delta, name) + (getattr(row, name) if row else 0)
+            for name in COUNT_FIELDS
+        }
+        intents = Counter(json.loads(row.intent_counts) if row and row.intent_counts else {})
+        intents.update(delta.intents)
+        values["intent_counts"] = json.dumps(dict(intents), sort_keys=True) if intents else None
+        if row:
+            updates.append({"id": row.id, **values})
+        else:
+            inserts.append({"id": generate_uuid(), "store_id": key[0], "bucket_start": key[1], **values})
+
+    if inserts:
+        db.execute(insert(model), inserts)
+    if updates:
+        db.execute(update(model), updates)
+
+
+def _earliest_activity(db: Session) -> datetime | None:
+    candidates = [
+        db.query(func.min(Message.timestamp)).scalar(),
+        db.query(func.min(Conversation.started_at)).scalar(),
+        db.query(func.min(Conversation.ended_at)).scalar(),
+    ]
+    candidates = [value for value in candidates if value is not None]
+    return min(candidates) - timedelta(seconds=1) if candidates else None
+
+
+def run_rollups(db: Session, now: datetime | None = None) -> dict:
+    """
+    Aggregate everything since the watermark and advance it
+
+    Works in windows of ROLLUP_BATCH_HOURS, one transaction per window,
+    so a large backfill can be interrupted and resumed safely. The
+    watermark row is locked (FOR UPDATE) so concurrent runs on
+    PostgreSQL cannot double count.
+    """
+    now = now or datetime.utcnow()
+    upper = now - timedelta(seconds=settings.rollup_lag_seconds)
+    step = timedelta(hours=settings.rollup_batch_hours)
+    windows = 0
+    rows = 0
+
+    while True:
+        watermark = (
+            db.query(RollupWatermark)
+            .filter(RollupWatermark.name == WATERMARK)
+            .with_for_update()
+            .first()
+        )
+        if watermark is None:
+            start = _earliest_activity(db)
+            if start is None:
+                db.rollback()
+                break
+            watermark = RollupWatermark(name=WATERMARK, processed_until=start)
+            db.add(watermark)
+
+        start = watermark.processed_until
+        if start >= upper:
+            db.rollback()
+            break
+        end = min(start + step, upper)
+
+        hourly = _aggregate(db, start, end)
+        daily = defaultdict(_Delta)
+        for (store_id, bucket), delta in hourly.items():
+            daily[(store_id, _day(bucket))].merge(delta)
+
+        _apply(db, StoreStatsHourly, hourly)
+        _apply(db, StoreStatsDaily, daily)
+        watermark.processed_until = end
+        db.commit()
+
+        windows += 1
+        rows += len(hourly)
+
+    result = {"windows": windows, "hourly_buckets_updated": rows, "processed_until": get_watermark(db)}
+    if windows:
+        logger.info("Rollups advanced: %s", result)
+    return result
+
+
+def get_watermark(db: Session) -> datetime | None:
+    watermark = db.get(RollupWatermark, WATERMARK)
+    return watermark.processed_until if watermark else None
+
+
+def store_summary(db: Session, store_id: str, start: datetime, end: datetime, granularity: str = "day") -> dict:
+    """Dashboard data for one store, read only from the rollup tables"""
+    model = StoreStatsDaily if granularity == "day" else StoreStatsHourly
+    rows = (
+        db.query(model)
+        .filter(model.store_id == store_id, model.bucket_start >= start, model.bucket_start < end)
+        .order_by(model.bucket_start)
+        .all()
+    )
+
+    totals = _Delta()
+    series = []
+    for row in rows:
+        intents = json.loads(row.intent_counts) if row.intent_counts else {}
+        for name in COUNT_FIELDS:
+            setattr(totals, name, getattr(totals, name) + getattr(row, name))
+        totals.intents.update(intents)
+        series.append({
+            "bucket_start": row.bucket_start,
+            "messages": row.messages,
+            "tokens_used": row.tokens_used,
+            "conversations_started": row.conversations_started,
+            "escalations": row.escalations,
+            "average_rating": round(row.rating_sum / row.rating_count, 2) if row.rating_count else None,
+        })
+
+    ended = totals.conversations_ended
+    return {
+        "store_id": store_id,
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "data_until": get_watermark(db),
+        "totals": {
+            "messages": totals.messages,
+            "user_messages": totals.user_messages,
+            "assistant_messages": totals.assistant_messages,
+            "tokens_used": totals.tokens_used,
+            "conversations_started": totals.conversations_started,
+            "conversations_ended": ended,
+            "escalations": totals.escalations,
+            "average_rating": round(totals.rating_sum / totals.rating_count, 2) if totals.rating_count else None,
+            "resolution_rate": round(totals.resolved / ended, 4) if ended else None,
+            "escalation_rate": round(totals.escalations / ended, 4) if ended else None,
+            "intents": dict(totals.intents.most_common()),
+        },
+        "series": series,
+    }
+
+
+def run_rollups_once() -> dict:
+    """Run the rollup job with its own session"""
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        return run_rollups(db)
+    finally:
+        db.close()
+
+
+async def rollup_forever(interval: float):
+    """Background loop started from the app lifespan"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(run_rollups_once)
+        except Exception:
+            logger.exception("Rollup run failed; retrying next interval")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Advance the dashboard rollups to now")
+    parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(run_rollups_once(), default=str, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,26 +1,32 @@
-from passlib.context import CryptContext
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from functools import lru_cache
+from fastapi import Header, HTTPException
 from app.config import get_settings
 
 settings = get_settings()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Password hashing (passlib/bcrypt and jose/cryptography load on first use)
+@lru_cache()
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """Create JWT access token"""
+    from jose import jwt
+    
     to_encode = data.copy()
     
     if expires_delta:
@@ -29,14 +35,27 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    encoded_jwt = jwt.encode(to_encode, settings.require("secret_key"), algorithm=settings.algorithm)
     return encoded_jwt
 
 
 def decode_access_token(token: str):
     """Decode and verify JWT token"""
+    from jose import JWTError, jwt
+    
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        payload = jwt.decode(token, settings.require("secret_key"), algorithms=[settings.algorithm])
         return payload
     except JWTError:
         return None
+
+
+def get_current_user_id(authorization: str | None = Header(default=None)) -> str:
+    """Dependency: user id from an `Authorization: Bearer <token>` header"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    payload = decode_access_token(authorization[7:])
+    if not payload or not payload.get("user_id"):
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return payload["user_id"]
@@ -0,0 +1,26 @@
+"""
+Lazily created SDK clients
+
+The Anthropic and Stripe SDKs are slow to import and need API keys, so
+they are loaded on first use instead of when the app is imported. Each
+client is created once and shared afterwards.
+"""
+from functools import lru_cache
+from app.config import get_settings
+
+settings = get_settings()
+
+
+@lru_cache()
+def get_anthropic_client():
+    """Get the shared Anthropic client"""
+    from anthropic import Anthropic
+    return Anthropic(api_key=settings.require("anthropic_api_key"))
+
+
+@lru_cache()
+def get_stripe():
+    """Get the configured stripe module"""
+    import stripe
+    stripe.api_key = settings.require("stripe_secret_key")
+    return stripe
@@ -5,15 +5,15 @@ from functools import lru_cache
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
     
-    # API Keys
-    anthropic_api_key: str
+    # API Keys (validated on first use, see require())
+    anthropic_api_key: str | None = None
     openai_api_key: str | None = None
     
     # Stripe
-    stripe_secret_key: str
-    stripe_publishable_key: str
+    stripe_secret_key: str | None = None
+    stripe_publishable_key: str | None = None
     stripe_webhook_secret: str | None = None
-    stripe_price_id_basic: str  # $79/month plan
+    stripe_price_id_basic: str | None = None  # $79/month plan
     
     # Database
     database_url: str = "sqlite:///./shopbot.db"
@@ -22,13 +22,14 @@ class Settings(BaseSettings):
     redis_url: str = "redis://localhost:6379/0"
     
     # JWT
-    secret_key: str
+    secret_key: str | None = None
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 10080  # 1 week
     
     # Environment
     environment: str = "development"
     debug: bool = True
+    log_level: str = "INFO"  # for the app.* loggers (route decisions, prefilter rejections, profiles)
     
     # CORS
     cors_origins: str = "http://localhost:3000,http://localhost:5173,https://shopifybotai.netlify.app"
@@ -41,10 +42,57 @@ class Settings(BaseSettings):
     max_tokens: int = 1000
     temperature: float = 0.7
     
+    # Model routing (see app/routing.py; per-store overrides under "routing" in Store.business_info)
+    routing_enabled: bool = True  # send simple turns to the fast model
+    fast_ai_model: str = "claude-3-5-haiku-20241022"
+    fast_max_tokens: int = 300
+
+    # Spam/abuse prefilter before any LLM call (see app/prefilter.py)
+    prefilter_enabled: bool = True
+    prefilter_max_chars: int = 4000  # longer chat messages (and user turns in history) are rejected
+    prefilter_max_assistant_chars: int = 16000  # per assistant turn in the client-supplied history
+    prefilter_max_history_chars: int = 64000  # all history turns together
+    prefilter_max_history_turns: int = 100
+    prefilter_repeat_limit: int = 3  # identical messages allowed per client IP per window
+    prefilter_repeat_window_seconds: int = 300
+    prefilter_max_tracked: int = 100000  # (IP, message) pairs remembered for repeat detection
+    trusted_proxy_hops: int = 0  # proxies in front of the app that append to X-Forwarded-For; 0 = use the peer address
+    
+    # Profiling (see app/profiling.py)
+    profiling_enabled: bool = False  # allows X-Profile: 1 (with the admin token) and sampled profiling
+    profile_sample_rate: float = 0.0  # fraction of requests profiled without the header
+    profile_interval_ms: float = 5.0
+    loop_lag_threshold_ms: int = 0  # log event loop stalls longer than this; 0 disables
+    
+    # Dashboard rollups (see app/analytics.py)
+    rollup_interval_seconds: int = 0  # run the rollup job in-process this often; 0 = external cron
+    rollup_lag_seconds: int = 60  # leave recent rows for the next run so in-flight writes land first
+    rollup_batch_hours: int = 24  # size of each rollup transaction window
+    
+    # Retention (see app/retention.py)
+    retention_days: int = 365  # conversations older than this move to archive files
+    retention_batch_size: int = 1000  # conversations per archive file / delete transaction
+    archive_dir: str = "./archive"
+    
+    # Widget bootstrap (see app/widget.py)
+    widget_cache_size: int = 10000  # stores (x2 keys: public key and domain) kept in memory
+    widget_cache_ttl_seconds: int = 300  # bounds staleness for updates made by other workers
+    widget_max_age_seconds: int = 60  # browser/CDN Cache-Control max-age
+    
+    # Admin endpoints
+    admin_token: str | None = None  # required in X-Admin-Token; admin endpoints are closed without it
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
     
+    def require(self, name: str) -> str:
+        """Return a setting that is only needed by some features, or fail with a clear error"""
+        value = getattr(self, name)
+        if not value:
+            raise RuntimeError(f"{name.upper()} is not configured - set it in the environment or .env")
+        return value
+    
     @property
     def cors_origins_list(self) -> list[str]:
         """Convert comma-separated CORS origins to list"""
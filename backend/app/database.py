@@ -2,6 +2,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.config import get_settings
 from app.models import Base
+from app.metrics import instrument_engine
 
 settings = get_settings()
 
@@ -11,6 +12,9 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
 )
 
+# Count and time every SQL statement for /metrics
+instrument_engine(engine)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -25,6 +29,11 @@ def get_db():
 
 
 def init_db():
-    """Initialize database - create all tables"""
+    """
+    Create all tables directly from the models
+    
+    Only for throwaway local databases - real deployments run
+    `alembic upgrade head` so schema changes are versioned.
+    """
     Base.metadata.create_all(bind=engine)
     print("✅ Database initialized!")
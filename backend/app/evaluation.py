@@ -0,0 +1,248 @@
+"""
+Offline batch evaluation of prompt and model changes
+
+Replays recorded shopper questions through the same prompt as
+/api/chat/message (build_chat_params) and writes one JSONL result per
+case with the answer, latency and token usage. Requests are not
+streamed: nobody is waiting on the first token offline, and parsing every
+stream event through the SDK costs far more CPU than one final message.
+
+Cases file, one JSON object per line:
+    {"id": "c1", "store_context": {...}, "routing": {...}, "conversation_history": [...], "message": "..."}
+`id` defaults to the line number and `store_context` to the demo store.
+`routing` holds the store's routing overrides, as stored under "routing"
+in Store.business_info. Live chat reads them from there and ignores
+store_context["routing"], so the runner ignores it too.
+
+- Bounded concurrency: at most --concurrency requests in flight. Cases
+  are read lazily, not loaded up front.
+- Checkpoint/resume: the output file is the checkpoint. Every result is
+  appended and flushed as it completes. Re-running with the same output
+  skips cases that already succeeded for the same prompt. Failed cases
+  are retried.
+- Routing: without --model each case goes through the same fast/full
+  routing as live traffic (app/routing.py), with the case's `routing`
+  overrides. --model pins one model.
+- Dedupe: cases that produce an identical request (model, temperature,
+  system prompt, messages) are sent once. Duplicates are written with
+  `deduplicated_from` and no extra tokens.
+
+    python -m app.evaluation cases.jsonl results.jsonl --concurrency 16
+    python -m app.evaluation cases.jsonl results-haiku.jsonl --model claude-3-5-haiku-latest --temperature 0
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator
+
+from app.clients import get_anthropic_client
+from app.routes.chat import DEFAULT_STORE_CONTEXT, build_chat_params
+from app.routing import RoutingRules, route_turn
+
+
+def prompt_key(params: dict) -> str:
+    """Stable hash of everything that determines the model's answer"""
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_checkpoint(path: str) -> tuple[set, dict]:
+    """(case_id, prompt_key) pairs already done and reusable answers per prompt"""
+    done = set()
+    answers = {}
+    if not os.path.exists(path):
+        return done, answers
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a torn last line from an interrupted run
+            if record.get("error"):
+                continue
+            done.add((record["case_id"], record["prompt_key"]))
+            answers.setdefault(record["prompt_key"], record)
+    return done, answers
+
+
+def iter_cases(path: str, model=None, max_tokens=None, temperature=None) -> Iterator[tuple[str, str, dict]]:
+    """(case_id, prompt_key, request params) for every case in the file"""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                case = json.loads(line)
+                store_context = case.get("store_context") or DEFAULT_STORE_CONTEXT
+                if not isinstance(store_context, dict):
+                    raise TypeError("store_context must be an object")
+                history = case.get("conversation_history") or []
+                case_model, case_max_tokens = model, max_tokens
+                if model is None:
+                    # Same fast/full routing as the live chat path; overrides stand in for the store's business_info
+                    rules = RoutingRules.from_overrides(case.get("routing"))
+                    route = route_turn(case["message"], len(history), rules, log=False)
+                    case_model, case_max_tokens = route.model, max_tokens or route.max_tokens
+                params = build_chat_params(
+                    store_context,
+                    history,
+                    case["message"],
+                    model=case_model,
+                    max_tokens=case_max_tokens,
+                    temperature=temperature,
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{number}: invalid case ({e})") from e
+            yield str(case.get("id", f"line-{number}")), prompt_key(params), params
+
+
+def run_case(params: dict) -> dict:
+    """Send one request; errors are returned, not raised, so the batch keeps going"""
+    start = time.perf_counter()
+    try:
+        response = get_anthropic_client().messages.create(**params)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}", "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+    return {
+        "response": "".join(block.text for block in response.content if block.type == "text"),
+        "stop_reason": response.stop_reason,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "input_tokens": response.usage.input_tokens,
+        "output_tokens": response.usage.output_tokens,
+    }
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _percentile(values: list[float], pct: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_evaluation(
+    cases_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    model: str | None = None,
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+    limit: int | None = None,
+) -> dict:
+    """Run every case not already in the output file; returns a summary"""
+    done, answers = load_checkpoint(output_path)
+    stats = {"cases": 0, "skipped": 0, "requests": 0, "deduplicated": 0, "errors": 0,
+             "input_tokens": 0, "output_tokens": 0}
+    latencies = []
+    in_flight = {}  # future -> (prompt key, params)
+    waiting = {}    # prompt key -> case ids sharing that request (first one owns it)
+
+    out = open(output_path, "a", encoding="utf-8")
+    if out.tell() and not _ends_with_newline(output_path):
+        out.write("\n")  # do not glue the next record onto a torn line
+
+    def write(record: dict):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    def write_duplicate(case_id: str, key: str, original: dict):
+        stats["deduplicated"] += 1
+        write({
+            "case_id": case_id, "prompt_key": key, "model": original["model"],
+            "max_tokens": original.get("max_tokens"), "temperature": original["temperature"], "response": original["response"],
+            "stop_reason": original.get("stop_reason"), "latency_ms": None,
+            "input_tokens": 0, "output_tokens": 0, "deduplicated_from": original["case_id"],
+        })
+
+    def collect(futures):
+        for future in futures:
+            key, params = in_flight.pop(future)
+            result = future.result()
+            owner, *duplicates = waiting.pop(key)
+            record = {"case_id": owner, "prompt_key": key, "model": params["model"],
+                      "max_tokens": params["max_tokens"], "temperature": params["temperature"], **result}
+            write(record)
+            if "error" in result:
+                stats["errors"] += 1
+                # Duplicates fail with it; a resume retries all of them
+                for case_id in duplicates:
+                    write({**record, "case_id": case_id, "deduplicated_from": owner})
+                continue
+            latencies.append(result["latency_ms"])
+            stats["input_tokens"] += result["input_tokens"]
+            stats["output_tokens"] += result["output_tokens"]
+            answers[key] = record
+            for case_id in duplicates:
+                write_duplicate(case_id, key, record)
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="evaluation")
+    started = time.perf_counter()
+    try:
+        for case_id, key, params in iter_cases(cases_path, model, max_tokens, temperature):
+            if limit is not None and stats["cases"] >= limit:
+                break
+            stats["cases"] += 1
+            if (case_id, key) in done:
+                stats["skipped"] += 1
+            elif key in answers:
+                write_duplicate(case_id, key, answers[key])
+            elif key in waiting:
+                waiting[key].append(case_id)
+            else:
+                waiting[key] = [case_id]
+                in_flight[pool.submit(run_case, params)] = (key, params)
+                stats["requests"] += 1
+                if len(in_flight) >= concurrency:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(finished)
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            collect(finished)
+    finally:
+        # On Ctrl-C, drop queued work; anything already written is kept for resume
+        pool.shutdown(wait=False, cancel_futures=True)
+        out.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        **stats,
+        "seconds": round(elapsed, 2),
+        "requests_per_second": round(stats["requests"] / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "max": max(latencies) if latencies else None,
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay chat cases against the model and record the answers")
+    parser.add_argument("cases", help="input JSONL of cases")
+    parser.add_argument("output", help="results JSONL (appended to; also the resume checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--model", help="override DEFAULT_AI_MODEL")
+    parser.add_argument("--max-tokens", type=int, help="override MAX_TOKENS")
+    parser.add_argument("--temperature", type=float, help="override TEMPERATURE")
+    parser.add_argument("--limit", type=int, help="only the first N cases")
+    args = parser.parse_args(argv)
+
+    summary = run_evaluation(
+        args.cases, args.output, concurrency=args.concurrency, model=args.model,
+        max_tokens=args.max_tokens, temperature=args.temperature, limit=args.limit,
+    )
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,205 @@
+"""
+Streaming export of a store's conversations and transcripts
+
+One query joins conversations to their messages, ordered so each
+conversation's messages arrive together. Rows are fetched through a
+server-side cursor in batches of `yield_per` as plain tuples. No ORM
+objects are loaded, so there are no relationship loads and nothing
+builds up in the identity map. Output is encoded and gzip-compressed
+chunk by chunk, so memory stays flat however many messages a store has.
+
+- csv:   one row per message, conversation columns repeated; text that
+         a spreadsheet would run as a formula is prefixed with '
+- jsonl: one line per conversation with its messages nested
+
+    python -m app.export --store-id <id> --format jsonl --output transcripts.jsonl.gz
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import zlib
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Conversation, Message
+
+FORMATS = ("csv", "jsonl")
+CONVERSATION_COLUMNS = (
+    "id", "customer_email", "customer_name", "status", "rating", "started_at", "ended_at",
+)
+MESSAGE_COLUMNS = ("id", "role", "content", "model_used", "tokens_used", "intent", "timestamp")
+CSV_HEADER = (
+    [f"conversation_{name}" for name in CONVERSATION_COLUMNS]
+    + [f"message_{name}" for name in MESSAGE_COLUMNS]
+)
+
+YIELD_PER = 2000
+CHUNK_BYTES = 64 * 1024
+
+# Leading characters that make Excel/Sheets/LibreOffice evaluate a cell
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _serialize(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_cell(value):
+    """Serialize for CSV, neutralizing formula injection in shopper-written text"""
+    if isinstance(value, str):
+        return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+    return _serialize(value)
+
+
+def iter_rows(
+    db: Session,
+    store_id: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    yield_per: int = YIELD_PER,
+) -> Iterator[tuple]:
+    """
+    Flat (conversation columns..., message columns...) tuples for a store
+
+    Conversations without messages still appear once with empty message
+    columns (outer join).
+    """
+    stmt = (
+        select(
+            *(getattr(Conversation, name) for name in CONVERSATION_COLUMNS),
+            *(getattr(Message, name) for name in MESSAGE_COLUMNS),
+        )
+        .outerjoin(Message, Message.conversation_id == Conversation.id)
+        .where(Conversation.store_id == store_id)
+        .order_by(Conversation.started_at, Conversation.id, Message.timestamp)
+    )
+    if start is not None:
+        stmt = stmt.where(Conversation.started_at >= start)
+    if end is not None:
+        stmt = stmt.where(Conversation.started_at < end)
+
+    # yield_per implies stream_results: a named cursor on PostgreSQL,
+    # so the driver does not buffer the whole result client-side
+    result = db.execute(stmt.execution_options(yield_per=yield_per))
+    try:
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        result.close()
+
+
+def iter_csv(rows: Iterator[tuple]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_jsonl(rows: Iterator[tuple]) -> Iterator[str]:
+    """Group the ordered rows back into one JSON object per conversation"""
+    split = len(CONVERSATION_COLUMNS)
+    parts = []
+    size = 0
+    current = None
+    for row in rows:
+        if current is None or current["id"] != row[0]:
+            if current is not None:
+                line = json.dumps(current, separators=(",", ":")) + "\n"
+                parts.append(line)
+                size += len(line)
+                if size >= CHUNK_BYTES:
+                    yield "".join(parts)
+                    parts = []
+                    size = 0
+            current = {name: _serialize(value) for name, value in zip(CONVERSATION_COLUMNS, row[:split])}
+            current["messages"] = []
+        if row[split] is not None:
+            current["messages"].append(
+                {name: _serialize(value) for name, value in zip(MESSAGE_COLUMNS, row[split:])}
+            )
+    if current is not None:
+        parts.append(json.dumps(current, separators=(",", ":")) + "\n")
+    yield "".join(parts)
+
+
+def gzip_chunks(chunks: Iterator[str], level: int = 6) -> Iterator[bytes]:
+    """Compress text chunks incrementally into a single gzip stream"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_store(
+    db: Session,
+    store_id: str,
+    fmt: str = "jsonl",
+    start: datetime | None = None,
+    end: datetime | None = None,
+    compress: bool = True,
+) -> Iterator[bytes]:
+    """Encoded (and optionally gzip-compressed) export of one store"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    rows = iter_rows(db, store_id, start, end)
+    chunks = iter_csv(rows) if fmt == "csv" else iter_jsonl(rows)
+    if compress:
+        return gzip_chunks(chunks)
+    return (chunk.encode("utf-8") for chunk in chunks)
+
+
+def stream_export(store_id: str, fmt: str, start=None, end=None, compress: bool = True) -> Iterator[bytes]:
+    """
+    Export generator for StreamingResponse
+
+    Request-scoped sessions are closed before a streaming body is sent,
+    so the export opens (and always closes) its own session.
+    """
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        yield from export_store(db, store_id, fmt, start, end, compress)
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export a store's conversations and transcripts")
+    parser.add_argument("--store-id", required=True)
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="conversations started at or after (ISO date)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="conversations started before (ISO date)")
+    parser.add_argument("--output", "-o", help="file to write (default: stdout)")
+    parser.add_argument("--no-gzip", action="store_true", help="write uncompressed output")
+    args = parser.parse_args(argv)
+
+    compress = not args.no_gzip
+    stream = stream_export(args.store_id, args.format, args.start, args.end, compress)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        for chunk in stream:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+    print(f"Wrote {written:,} bytes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,15 +1,36 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
+import logging
+import random
+import time
 import uvicorn
 
+from app.analytics import rollup_forever
 from app.config import get_settings
-from app.database import init_db
+from app.metrics import REQUEST_LATENCY, render_latest
+from app.profiling import LoopLagMonitor, RequestProfile, StackSampler
+from app.responses import FastJSONResponse
 
 settings = get_settings()
 
 
+def configure_logging():
+    """Send app.* log records to stderr; uvicorn only configures its own loggers"""
+    app_logger = logging.getLogger("app")
+    if not app_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        app_logger.addHandler(handler)
+    app_logger.setLevel(settings.log_level.upper())
+    app_logger.propagate = False  # a root handler would print every record twice
+
+
+configure_logging()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
@@ -17,10 +38,25 @@ async def lifespan(app: FastAPI):
     print(f"Environment: {settings.environment}")
     print(f"Debug Mode: {settings.debug}")
     
-    # Initialize database
-    init_db()
+    # Schema changes are applied by `alembic upgrade head`, not on every boot
+    
+    # Watch for coroutines that block the event loop
+    lag_monitor = None
+    if settings.loop_lag_threshold_ms > 0:
+        lag_monitor = LoopLagMonitor(threshold=settings.loop_lag_threshold_ms / 1000)
+        lag_monitor.start()
+    
+    # Keep dashboard rollups fresh
+    rollup_task = None
+    if settings.rollup_interval_seconds > 0:
+        rollup_task = asyncio.create_task(rollup_forever(settings.rollup_interval_seconds))
     
     yield
+    
+    if rollup_task:
+        rollup_task.cancel()
+    if lag_monitor:
+        await lag_monitor.stop()
     print("👋 Shutting down ShopBot AI Backend...")
 
 
@@ -29,9 +65,13 @@ app = FastAPI(
     title="ShopBot AI API",
     description="AI-powered customer support for e-commerce",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# Stack sampler shared by the profiling middleware and the admin endpoints
+app.state.stack_sampler = StackSampler(interval=settings.profile_interval_ms / 1000)
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -42,6 +82,52 @@ app.add_middleware(
 )
 
 
+# Request latency middleware
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Observe request latency labelled by route template (not raw path)"""
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status_code)
+        )
+
+
+# Opt-in profiling middleware
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """Sample the event loop stack for admin requests with X-Profile: 1 or picked by the sample rate"""
+    if not settings.profiling_enabled or not (
+        (request.headers.get("x-profile") == "1" and admin.is_admin(request.headers.get("x-admin-token")))
+        or random.random() < settings.profile_sample_rate
+    ):
+        return await call_next(request)
+    
+    sampler = app.state.stack_sampler
+    profile = RequestProfile(method=request.method, route=request.url.path)
+    start = time.perf_counter()
+    sampler.start(profile)
+    try:
+        response = await call_next(request)
+    finally:
+        profile.duration_ms = (time.perf_counter() - start) * 1000
+        route = request.scope.get("route")
+        profile.route = getattr(route, "path", profile.route)
+        sampler.stop(profile)
+    
+    response.headers["X-Profile-Id"] = profile.id
+    return response
+
+
 # Health check endpoint
 @app.get("/")
 async def root():
@@ -65,10 +151,16 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(render_latest(), media_type="text/plain; version=0.0.4")
+
+
 # Error handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={"error": exc.detail}
     )
@@ -76,18 +168,21 @@ async def http_exception_handler(request, exc):
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
         content={"error": "Internal server error", "detail": str(exc)}
     )
 
 
 # Import and include routers
-from app.routes import chat, payment
+from app.routes import admin, analytics, chat, payment, widget
 # from app.routes import auth  # We'll add this later
 # app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
 app.include_router(payment.router, prefix="/api/payment", tags=["payment"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(widget.router, prefix="/api/widget", tags=["widget"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,291 @@
+"""
+Prometheus-style metrics for the hot paths of the API
+
+Metrics live in process memory and are rendered in the Prometheus text
+exposition format by the /metrics endpoint. Observations only take a
+short uncontended lock, a bisect over the bucket bounds and two
+increments, which keeps them well under 5µs (see benchmarks/bench_metrics.py).
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Latency buckets in seconds, tuned for API calls (fast DB queries up to slow LLM turns)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, labelvalues, extra: str = "") -> str:
+    """Render a {name="value",...} label set"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class - keeps one child per label combination"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _child(self, labelvalues: tuple):
+        child = self._children.get(labelvalues)
+        if child is None:
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+            with self._lock:
+                child = self._children.setdefault(labelvalues, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labelvalues, child in sorted(self._children.items()):
+            lines.extend(self._render_child(labelvalues, child))
+        return lines
+
+    def _render_child(self, labelvalues, child) -> list[str]:
+        raise NotImplementedError
+
+    def clear(self):
+        """Drop all recorded values (used by benchmarks)"""
+        with self._lock:
+            self._children.clear()
+
+
+class _CounterChild:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, *labelvalues, amount: float = 1):
+        child = self._child(labelvalues)
+        with child.lock:
+            child.value += amount
+
+    def value(self, *labelvalues) -> float:
+        child = self._children.get(labelvalues)
+        return child.value if child else 0
+
+    def _render_child(self, labelvalues, child):
+        return [f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(child.value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "lock")
+
+    def __init__(self, size: int):
+        # One slot per bucket plus the +Inf overflow slot (non-cumulative)
+        self.counts = [0] * (size + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; buckets are cumulated only when rendered"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(len(self.buckets))
+
+    def observe(self, value: float, *labelvalues):
+        child = self._children.get(labelvalues) or self._child(labelvalues)
+        index = bisect_left(self.buckets, value)
+        with child.lock:
+            child.counts[index] += 1
+            child.sum += value
+
+    @contextmanager
+    def time(self, *labelvalues):
+        """Observe the wall time spent inside the block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def _render_child(self, labelvalues, child):
+        with child.lock:
+            counts = list(child.counts)
+            total = child.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = f'le="{_format_value(float(bound))}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, labelvalues)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render_latest() -> str:
+    """Render every registered metric in the Prometheus text format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+
+ANTHROPIC_LATENCY = Histogram(
+    "anthropic_request_duration_seconds",
+    "Total latency of Anthropic API calls",
+    ("model", "operation"),
+)
+
+ANTHROPIC_TTFT = Histogram(
+    "anthropic_time_to_first_token_seconds",
+    "Time until the first streamed text token arrives from Anthropic",
+    ("model", "operation"),
+)
+
+ANTHROPIC_TOKENS = Counter(
+    "anthropic_tokens_total",
+    "Input and output tokens reported by Anthropic usage",
+    ("model", "direction"),
+)
+
+ANTHROPIC_ERRORS = Counter(
+    "anthropic_errors_total",
+    "Failed Anthropic API calls",
+    ("model", "operation"),
+)
+
+STRIPE_LATENCY = Histogram(
+    "stripe_request_duration_seconds",
+    "Latency of Stripe API calls",
+    ("operation", "outcome"),
+)
+
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL statements executed",
+    ("statement",),
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ("statement",),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+CHAT_ROUTES = Counter(
+    "chat_route_decisions_total",
+    "Chat turns by model route (fast/full) and the rule that decided it",
+    ("route", "reason"),
+)
+
+CHAT_PREFILTER = Counter(
+    "chat_prefilter_rejections_total",
+    "Chat messages rejected locally before reaching Anthropic",
+    ("endpoint", "reason"),
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by result (hit ratio = hit / (hit + miss))",
+    ("cache", "result"),
+)
+
+
+def record_anthropic_usage(model: str, usage):
+    """Record the token counts from an Anthropic `response.usage` object"""
+    if usage is None:
+        return
+    ANTHROPIC_TOKENS.inc(model, "input", amount=usage.input_tokens or 0)
+    ANTHROPIC_TOKENS.inc(model, "output", amount=usage.output_tokens or 0)
+
+
+def record_cache(cache: str, hit: bool):
+    """Record a cache lookup so hit ratios can be graphed"""
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+@contextmanager
+def time_stripe(operation: str):
+    """Time a Stripe API call, labelled by operation and outcome"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        STRIPE_LATENCY.observe(time.perf_counter() - start, operation, outcome)
+
+
+def _statement_type(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def instrument_engine(engine):
+    """Count and time every statement through SQLAlchemy cursor events"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start_time"].pop()
+        kind = _statement_type(statement)
+        DB_QUERIES.inc(kind)
+        DB_QUERY_LATENCY.observe(time.perf_counter() - start, kind)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+            DB_QUERIES.inc("ERROR")
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
+import secrets
 import uuid
 
 Base = declarative_base()
@@ -11,6 +12,19 @@ def generate_uuid():
     return str(uuid.uuid4())
 
 
+def generate_public_key():
+    """Non-secret store identifier for the embedded widget"""
+    return f"pk_{secrets.token_urlsafe(16)}"
+
+
+def normalize_domain(domain: str) -> str:
+    """shop.example.com from "https://Shop.Example.com/", "shop.example.com:443" etc."""
+    domain = domain.strip().lower()
+    if "://" in domain:
+        domain = domain.split("://", 1)[1]
+    return domain.split("/", 1)[0].split(":", 1)[0].rstrip(".")
+
+
 class User(Base):
     __tablename__ = "users"
     
@@ -113,7 +127,10 @@ class Store(Base):
     
     # Store info
     store_name = Column(String)
-    store_domain = Column(String)
+    store_domain = Column(String, index=True)  # normalized on assignment (normalize_domain)
+    
+    # Public identifier embedded in the widget script tag
+    public_key = Column(String, unique=True, index=True, default=generate_public_key)
     
     # Chatbot configuration
     business_info = Column(Text)  # JSON: return policy, shipping info, etc.
@@ -128,9 +145,18 @@ class Store(Base):
     user = relationship("User", back_populates="stores")
     conversations = relationship("Conversation", back_populates="store")
 
+    @validates("store_domain")
+    def _normalize_store_domain(self, key, value):
+        # The widget looks stores up by normalized domain
+        return normalize_domain(value) if value else value
+
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # A store's recent chats: WHERE store_id = ? ORDER BY started_at DESC
+        Index("ix_conversations_store_id_started_at", "store_id", "started_at"),
+    )
     
     id = Column(String, primary_key=True, default=generate_uuid)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -149,8 +175,10 @@ class Conversation(Base):
     extra_data = Column(Text)  # JSON: browser, location, etc.
 
     
-    started_at = Column(DateTime, default=datetime.utcnow)
-    ended_at = Column(DateTime)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # Rollups count status and rating in the window of ended_at only: set
+    # them in the same write as ended_at (see app/analytics.py)
+    ended_at = Column(DateTime, index=True)  # rollups scan conversations by these ranges
     
     # Relationships
     user = relationship("User", back_populates="conversations")
@@ -160,6 +188,10 @@ class Conversation(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Loading a conversation in order: WHERE conversation_id = ? ORDER BY timestamp
+        Index("ix_messages_conversation_id_timestamp", "conversation_id", "timestamp"),
+    )
     
     id = Column(String, primary_key=True, default=generate_uuid)
     conversation_id = Column(String, ForeignKey("conversations.id"), nullable=False)
@@ -170,8 +202,49 @@ class Message(Base):
     # AI metadata
     model_used = Column(String)  # claude-sonnet-4-20250514
     tokens_used = Column(Integer)
+    intent = Column(String)  # order_tracking, product_question, ... (user messages)
     
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
+
+
+# Pre-aggregated dashboard analytics (maintained by app/analytics.py)
+class StoreStatsMixin:
+    id = Column(String, primary_key=True, default=generate_uuid)
+    store_id = Column(String, nullable=False)
+    bucket_start = Column(DateTime, nullable=False)  # start of the hour / day (UTC)
+    
+    # Messages
+    messages = Column(Integer, default=0, nullable=False)
+    user_messages = Column(Integer, default=0, nullable=False)
+    assistant_messages = Column(Integer, default=0, nullable=False)
+    tokens_used = Column(Integer, default=0, nullable=False)
+    intent_counts = Column(Text)  # JSON: {"order_tracking": 12, ...}
+    
+    # Conversations (started by started_at, outcomes by ended_at)
+    conversations_started = Column(Integer, default=0, nullable=False)
+    conversations_ended = Column(Integer, default=0, nullable=False)
+    resolved = Column(Integer, default=0, nullable=False)
+    escalations = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    rating_count = Column(Integer, default=0, nullable=False)
+
+
+class StoreStatsHourly(StoreStatsMixin, Base):
+    __tablename__ = "store_stats_hourly"
+    __table_args__ = (UniqueConstraint("store_id", "bucket_start", name="uq_store_stats_hourly_bucket"),)
+
+
+class StoreStatsDaily(StoreStatsMixin, Base):
+    __tablename__ = "store_stats_daily"
+    __table_args__ = (UniqueConstraint("store_id", "bucket_start", name="uq_store_stats_daily_bucket"),)
+
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+    
+    name = Column(String, primary_key=True)  # e.g. "store_stats"
+    processed_until = Column(DateTime, nullable=False)  # everything <= this is aggregated
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
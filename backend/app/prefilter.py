@@ -0,0 +1,261 @@
+"""
+Local spam and abuse prefilter for chat messages
+
+Runs before any Anthropic call, so junk, floods of the same text and
+known prompt-injection payloads cost microseconds instead of a model
+call. Checks, cheapest first:
+
+1. length: empty, or longer than PREFILTER_MAX_CHARS; history turns are
+   capped too (PREFILTER_MAX_ASSISTANT_CHARS per assistant turn,
+   PREFILTER_MAX_HISTORY_CHARS and PREFILTER_MAX_HISTORY_TURNS overall)
+2. charset: control/invisible characters, too few distinct characters
+   ("aaaa..."), mostly symbols, long ASCII blobs without spaces
+3. known prompt-injection strings (compiled patterns behind substring anchors)
+4. repeats: the same (case-insensitive) message from the same client IP more
+   than PREFILTER_REPEAT_LIMIT times within PREFILTER_REPEAT_WINDOW_SECONDS
+
+The repeat tracker lives in process memory, so with several workers each
+counts its own share of a flood. Behind a proxy, the client IP is read
+from X-Forwarded-For (see client_ip and TRUSTED_PROXY_HOPS).
+"""
+import logging
+import re
+import string
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+from app.config import get_settings
+from app.metrics import CHAT_PREFILTER
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SAMPLE_CHARS = 256  # symbol and variety checks look at the start of the message
+MIN_SYMBOL_CHECK_CHARS = 20
+MAX_SYMBOL_RATIO = 0.5  # "!!!$$$###..." soup
+MIN_VARIETY_CHECK_CHARS = 40
+MIN_DISTINCT_CHARS = 6  # "aaaa...", "lol lol lol ...", one emoji repeated
+CHARS_PER_SPACE = 120  # ASCII with fewer spaces than this is one long blob (base64, hex, keyboard mash)
+
+# ASCII messages are checked with bytes.translate (a C loop); the regexes
+# below are the fallback for everything else
+ASCII_ALLOWED = bytes(range(0x20, 0x7f)) + b"\t\n\r"
+ASCII_WORDISH = (string.ascii_letters + string.digits + "_" + string.whitespace).encode()
+ASCII_WHITESPACE = string.whitespace.encode()
+# C0 controls except tab/newline/CR, DEL, zero-width spaces and bidi overrides
+# (used to hide text); ZWJ/ZWNJ and LRM/RLM are left alone, emoji and
+# several scripts need them
+CONTROL_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\u200b\u202a-\u202e\u2060-\u2064\u2066-\u2069\ufeff]")
+SYMBOL = re.compile(r"[^\w\s]")
+
+# Known injection strings, matched against the lowercased message. Each
+# rule's patterns only run when one of its anchor substrings is present,
+# and every pattern starts with a literal so the regex engine can skip
+# ahead; a rule without patterns matches on the anchor alone, so those
+# anchors must never be everyday words ("jailbreak tshirts", "can you
+# do anything now"). Prompt requests need a qualifier ("your system
+# prompt"), since "tell me your instructions for washing" is a real question.
+_PREVIOUS = r"\s+(?:(?:all|any|the|your|of|my)\s+)*(?:previous|prior|above|earlier|system|original)\s+(?:instructions?|prompts?|rules)"
+_PROMPT = r"\s+(?:me\s+)?(?:your|the)\s+(?:system|initial|hidden|original|previous)\s+(?:prompt|instructions)"
+_UNFILTERED = r"\s+(?:an?\s+)?(?:unfiltered|unrestricted|uncensored|jailbroken)"
+INJECTION_RULES = (
+    (
+        ("instruction", "prompt", "rules"),
+        tuple(re.compile(verb + _PREVIOUS) for verb in ("ignore", "disregard", "forget", "override"))
+        + tuple(re.compile(verb + _PROMPT) for verb in ("reveal", "print", "show", "repeat", "output", "leak", "tell"))
+        + (re.compile(r"system\s+prompt\s*[:=]"), re.compile(r"new\s+instructions\s*:")),
+    ),
+    (
+        ("you are now",),
+        (re.compile(r"you\s+are\s+now\s+(?:in\s+)?(?:dan\b|developer\s+mode|jailbroken|unfiltered|unrestricted)"),),
+    ),
+    (
+        ("unfiltered", "unrestricted", "uncensored", "jailbroken"),
+        (re.compile(r"act\s+as" + _UNFILTERED), re.compile(r"pretend\s+(?:to\s+be|you\s+are)" + _UNFILTERED)),
+    ),
+    # ChatML / Llama chat-template tokens
+    (("im_start", "inst]", "sys>>", "system>"), ()),
+)
+
+EMPTY = "empty"
+TOO_LONG = "too_long"
+CONTROL = "control_chars"
+REPEATED_CHARS = "repeated_chars"
+SYMBOLS = "symbols"
+LONG_TOKEN = "long_token"
+TOO_MANY_TURNS = "too_many_turns"
+INJECTION = "injection"
+REPEATED = "repeated_message"
+
+
+def rejection_response(reason: str) -> tuple[int, str]:
+    """(status code, detail) for a rejected message; vague on purpose about which rule matched"""
+    if reason == REPEATED:
+        return 429, "Too many identical messages, please wait a moment"
+    return 400, "Message could not be processed"
+
+
+def is_injection(message: str) -> bool:
+    """True if the message contains a known prompt-injection string"""
+    lowered = message.lower()
+    for anchors, patterns in INJECTION_RULES:
+        if not any(anchor in lowered for anchor in anchors):
+            continue
+        if not patterns or any(pattern.search(lowered) for pattern in patterns):
+            return True
+    return False
+
+
+def check_content(message: str, max_chars: int) -> str | None:
+    """Rejection reason from the message text alone, or None"""
+    length = len(message)
+    if length > max_chars:
+        return TOO_LONG
+    if not length or message.isspace():
+        return EMPTY
+    sample = message[:SAMPLE_CHARS]
+    if message.isascii():
+        raw = message.encode("ascii")
+        if raw.translate(None, ASCII_ALLOWED):
+            return CONTROL
+        symbols = len(raw[:SAMPLE_CHARS].translate(None, ASCII_WORDISH))
+        blob = length >= CHARS_PER_SPACE and (length - len(raw.translate(None, ASCII_WHITESPACE))) * CHARS_PER_SPACE < length
+    else:
+        if CONTROL_CHARS.search(message):
+            return CONTROL
+        symbols = len(SYMBOL.findall(sample))
+        blob = False  # many scripts do not separate words with spaces
+    if length >= MIN_VARIETY_CHECK_CHARS and len(set(sample)) < MIN_DISTINCT_CHARS:
+        return REPEATED_CHARS
+    if len(sample) >= MIN_SYMBOL_CHECK_CHARS and symbols > len(sample) * MAX_SYMBOL_RATIO:
+        return SYMBOLS
+    if blob:
+        return LONG_TOKEN
+    if is_injection(message):
+        return INJECTION
+    return None
+
+
+class RepeatTracker:
+    """
+    Rolling set of (client IP, message hash) with expiry
+
+    Each entry counts how often that message arrived since its window
+    opened. Entries are kept in window-start order, so expired ones are
+    dropped from the front on every call; the oldest are evicted beyond
+    `max_entries`.
+    """
+
+    def __init__(self, limit: int, window: float, max_entries: int, min_chars: int = 8):
+        self.limit = limit
+        self.window = window
+        self.max_entries = max_entries
+        self.min_chars = min_chars  # short replies ("yes", "ok") legitimately repeat
+        self._entries = OrderedDict()  # (ip, hash) -> [window_start, count]
+        self._lock = threading.Lock()
+
+    def seen(self, client_ip: str, message: str, now: float | None = None) -> bool:
+        """Record the message; True once it repeats more than `limit` times in the window"""
+        normalized = message.strip().lower()
+        if len(normalized) < self.min_chars:
+            return False
+        now = time.monotonic() if now is None else now
+        key = (client_ip, hash(normalized))
+        expired_before = now - self.window
+        entries = self._entries
+        with self._lock:
+            while entries:
+                oldest = next(iter(entries.values()))
+                if oldest[0] > expired_before and len(entries) < self.max_entries:
+                    break
+                entries.popitem(last=False)
+            entry = entries.get(key)
+            if entry is None:
+                entries[key] = [now, 1]
+                return False
+            entry[1] += 1
+            return entry[1] > self.limit
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+repeat_tracker = RepeatTracker(
+    limit=settings.prefilter_repeat_limit,
+    window=settings.prefilter_repeat_window_seconds,
+    max_entries=settings.prefilter_max_tracked,
+)
+
+
+def check_history(history: Iterable[tuple[str, str]]) -> str | None:
+    """Rejection reason ("history_...") for the conversation history, or None"""
+    history = list(history)
+    # Size caps first, so oversized histories are rejected without scanning them
+    if len(history) > settings.prefilter_max_history_turns:
+        return f"history_{TOO_MANY_TURNS}"
+    if sum(len(content) for _, content in history) > settings.prefilter_max_history_chars:
+        return f"history_{TOO_LONG}"
+    for role, content in history:
+        max_chars = settings.prefilter_max_assistant_chars if role == "assistant" else settings.prefilter_max_chars
+        reason = check_content(content, max_chars)
+        if reason is not None:
+            return f"history_{reason}"
+    return None
+
+
+def client_ip(peer: str | None, forwarded_for: str | None) -> str | None:
+    """
+    Client address for the repeat tracker
+
+    With TRUSTED_PROXY_HOPS = n, each of the n proxies in front of the app
+    appends the address it received the request from to X-Forwarded-For,
+    so the client is the n-th entry from the right. Anything left of it
+    was written by the client and is ignored. Without trusted proxies, or
+    when the header is shorter than expected, the peer address is used.
+    """
+    hops = settings.trusted_proxy_hops
+    if hops <= 0 or not forwarded_for:
+        return peer
+    entries = [entry.strip() for entry in forwarded_for.split(",")]
+    if len(entries) < hops or not entries[-hops]:
+        return peer
+    return entries[-hops]
+
+
+def screen_message(
+    message: str,
+    client_ip: str | None,
+    endpoint: str,
+    history: Iterable[tuple[str, str]] = (),
+    log: bool = True
+) -> str | None:
+    """
+    Run every check; returns the rejection reason or None to let the message through
+
+    `history` is the client-supplied conversation as (role, content)
+    pairs. The client can write anything into it, assistant turns
+    included, and all of it goes to the model, so every turn gets the
+    content checks. Assistant turns get the larger
+    PREFILTER_MAX_ASSISTANT_CHARS limit, since real replies can run long.
+    Rejections are counted in chat_prefilter_rejections_total and logged.
+    """
+    if not settings.prefilter_enabled:
+        return None
+    reason = check_content(message, settings.prefilter_max_chars)
+    if reason is None:
+        reason = check_history(history)
+    if reason is None and client_ip and repeat_tracker.seen(client_ip, message):
+        reason = REPEATED
+    if reason is None:
+        return None
+
+    CHAT_PREFILTER.inc(endpoint, reason)
+    if log:
+        logger.info("chat prefilter rejected endpoint=%s reason=%s ip=%s chars=%s", endpoint, reason, client_ip, len(message))
+    return reason
@@ -0,0 +1,209 @@
+"""
+Opt-in request profiling and event loop lag monitoring
+
+A background thread samples the event loop thread's stack while a
+profiled request is in flight. Samples are stored per request and
+aggregated in the collapsed-stack format that flamegraph.pl and
+speedscope read ("frame;frame;frame count").
+
+The lag monitor pairs an asyncio heartbeat with a watchdog thread: when
+the heartbeat stops for longer than the threshold, the watchdog grabs
+the loop thread's stack, so the log names the code that blocked it.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+from app.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 64
+RECENT_PROFILES = 200
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between scheduled and actual event loop heartbeats",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+def collapse_stack(frame) -> str:
+    """Render a frame chain root-first as module:function;module:function"""
+    frames = []
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        module = frame.f_globals.get("__name__", "?")
+        frames.append(f"{module}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+@dataclass(eq=False)
+class RequestProfile:
+    """
+    Stack samples captured while one request was running
+
+    The sampler sees the event loop thread, not the request's task, so
+    while other requests are in flight their stacks land in this profile
+    too. `shared_samples` counts the samples taken while another profile
+    was active; when it is close to the total, profile requests one at a
+    time (X-Profile: 1 on a quiet instance) for a clean picture.
+    """
+    method: str
+    route: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started_at: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+    samples: Counter = field(default_factory=Counter)
+    shared_samples: int = 0
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "route": self.route,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": sum(self.samples.values()),
+            "shared_samples": self.shared_samples,
+        }
+
+
+class StackSampler:
+    """Samples one thread's stack into every active RequestProfile"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._target_thread_id = None
+        self._active = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._recent = deque(maxlen=RECENT_PROFILES)
+        self._aggregate = Counter()
+
+    def start(self, profile: RequestProfile):
+        with self._lock:
+            self._target_thread_id = threading.get_ident()
+            self._active.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, profile: RequestProfile):
+        with self._lock:
+            self._active.discard(profile)
+            self._recent.append(profile)
+            for stack, count in profile.samples.items():
+                self._aggregate[f"{profile.method} {profile.route};{stack}"] += count
+
+    def _run(self):
+        while True:
+            with self._lock:
+                active = list(self._active)
+                target = self._target_thread_id
+            if not active:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                stack = collapse_stack(frame)
+                # stop() reads samples under the lock; a profile stopped
+                # since the snapshot above is skipped
+                with self._lock:
+                    shared = len(self._active) > 1
+                    for profile in active:
+                        if profile in self._active:
+                            profile.samples[stack] += 1
+                            profile.shared_samples += shared
+            del frame
+            time.sleep(self.interval)
+
+    def collapsed(self, route: str | None = None) -> str:
+        """Aggregated samples of all finished profiles, one stack per line"""
+        with self._lock:
+            items = list(self._aggregate.items())
+        lines = [
+            f"{stack} {count}"
+            for stack, count in sorted(items)
+            if route is None or stack.split(";", 1)[0].split(" ", 1)[-1] == route
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def recent(self) -> list[dict]:
+        with self._lock:
+            return [profile.summary() for profile in reversed(self._recent)]
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._aggregate.clear()
+
+
+class LoopLagMonitor:
+    """Logs the stack of whatever blocks the event loop longer than the threshold"""
+
+    def __init__(self, threshold: float, interval: float = 0.05):
+        self.threshold = threshold
+        self.interval = interval
+        self._last_beat = time.monotonic()
+        self._loop_thread_id = None
+        self._loop = None
+        self._task = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-lag-heartbeat")
+        threading.Thread(target=self._watchdog, name="loop-lag-watchdog", daemon=True).start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            EVENT_LOOP_LAG.observe(max(0.0, now - expected))
+            self._last_beat = now
+
+    def _watchdog(self):
+        # The culprit is captured while the loop is still stuck and logged
+        # once the heartbeat resumes, so the log carries the full stall time
+        stalled_beat = None
+        culprit = None
+        while not self._stopped.wait(self.interval / 2):
+            beat = self._last_beat
+            if stalled_beat is not None and beat != stalled_beat:
+                stalled = beat - stalled_beat - self.interval
+                logger.warning(
+                    "Event loop blocked for %.0f ms by %s\n  stack: %s",
+                    stalled * 1000, culprit[0], culprit[1].replace(";", "\n    -> ")
+                )
+                stalled_beat = culprit = None
+            # The heartbeat is due every interval, so only time past that counts as a stall
+            if stalled_beat is None and time.monotonic() - beat - self.interval >= self.threshold:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = collapse_stack(frame) if frame is not None else "<unknown>"
+                del frame
+                stalled_beat = beat
+                culprit = (self._current_coroutine(), stack)
+
+    def _current_coroutine(self) -> str:
+        task = asyncio.tasks._current_tasks.get(self._loop)
+        if task is None:
+            return "<no running task>"
+        coro = task.get_coro()
+        return f"{task.get_name()} ({getattr(coro, '__qualname__', repr(coro))})"
@@ -0,0 +1,260 @@
+"""
+Admin reporting CLI
+
+Counts are aggregated in SQL and listings are streamed from a cursor
+(yield_per) with the related rows joined in the same query, so reports
+finish in constant memory however large the database is.
+
+    python -m app.reports                          # summary
+    python -m app.reports summary --format json
+    python -m app.reports users --status active --plan basic --since 2024-01-01
+    python -m app.reports promos --active
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.models import PromoCode, Subscription, User
+
+YIELD_PER = 1000
+
+USER_COLUMNS = (
+    ("email", 32), ("full_name", 20), ("company_name", 20), ("created_at", 19),
+    ("status", 10), ("plan", 10), ("price", 7), ("discount_pct", 12), ("promo_code", 12),
+)
+PROMO_COLUMNS = (
+    ("code", 14), ("discount", 10), ("times_used", 10), ("max_uses", 9), ("subscriptions", 13),
+    ("is_active", 9), ("valid_until", 19), ("description", 32),
+)
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="seconds")
+    return value
+
+
+def summary(db: Session) -> dict:
+    """Headline counts, all computed with aggregates"""
+    total, active, verified = db.execute(
+        select(
+            func.count(User.id),
+            func.sum(case((User.is_active.is_(True), 1), else_=0)),
+            func.sum(case((User.is_verified.is_(True), 1), else_=0)),
+        )
+    ).one()
+
+    by_status = dict(db.execute(
+        select(Subscription.status, func.count(Subscription.id)).group_by(Subscription.status)
+    ).all())
+
+    # Users per plan; users without a subscription are counted under "none"
+    plan = func.coalesce(Subscription.plan_name, "none")
+    per_plan = dict(db.execute(
+        select(plan, func.count(User.id))
+        .select_from(User)
+        .outerjoin(Subscription, Subscription.user_id == User.id)
+        .group_by(plan)
+    ).all())
+
+    mrr = db.execute(
+        select(func.coalesce(func.sum(Subscription.monthly_price * (100 - func.coalesce(Subscription.discount_percent, 0)) / 100), 0))
+        .where(Subscription.status.in_(("active", "trialing")))
+    ).scalar()
+
+    promo_totals = db.execute(
+        select(
+            func.count(PromoCode.id),
+            func.sum(case((PromoCode.is_active.is_(True), 1), else_=0)),
+            func.coalesce(func.sum(PromoCode.times_used), 0),
+        )
+    ).one()
+
+    return {
+        "users": {"total": total, "active": active or 0, "verified": verified or 0},
+        "subscriptions_by_status": by_status,
+        "users_per_plan": per_plan,
+        "monthly_recurring_revenue": round(float(mrr), 2),
+        "promo_codes": {
+            "total": promo_totals[0],
+            "active": promo_totals[1] or 0,
+            "redemptions": promo_totals[2],
+        },
+    }
+
+
+def iter_users(
+    db: Session,
+    status: str | None = None,
+    plan: str | None = None,
+    since: datetime | None = None,
+    email: str | None = None,
+    limit: int | None = None,
+) -> Iterator[dict]:
+    """Users with their subscription and promo code, one joined query"""
+    stmt = (
+        select(
+            User.email, User.full_name, User.company_name, User.created_at,
+            Subscription.status, Subscription.plan_name, Subscription.monthly_price,
+            Subscription.discount_percent, PromoCode.code,
+        )
+        .select_from(User)
+        .outerjoin(Subscription, Subscription.user_id == User.id)
+        .outerjoin(PromoCode, PromoCode.id == Subscription.promo_code_id)
+        .order_by(User.created_at, User.id)
+    )
+    if status:
+        stmt = stmt.where(Subscription.status == status)
+    if plan:
+        stmt = stmt.where(Subscription.plan_name == plan)
+    if since:
+        stmt = stmt.where(User.created_at >= since)
+    if email:
+        stmt = stmt.where(User.email.ilike(f"%{email}%"))
+    if limit:
+        stmt = stmt.limit(limit)
+
+    names = [name for name, _ in USER_COLUMNS]
+    for row in db.execute(stmt.execution_options(yield_per=YIELD_PER)):
+        yield dict(zip(names, (_value(value) for value in row)))
+
+
+def iter_promos(db: Session, active: bool | None = None, code: str | None = None) -> Iterator[dict]:
+    """Promo codes with the number of subscriptions that used each one"""
+    used_by = (
+        select(Subscription.promo_code_id, func.count(Subscription.id).label("subscriptions"))
+        .group_by(Subscription.promo_code_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            PromoCode.code, PromoCode.discount_type, PromoCode.discount_value, PromoCode.times_used,
+            PromoCode.max_uses, func.coalesce(used_by.c.subscriptions, 0), PromoCode.is_active,
+            PromoCode.valid_until, PromoCode.description,
+        )
+        .outerjoin(used_by, used_by.c.promo_code_id == PromoCode.id)
+        .order_by(PromoCode.created_at, PromoCode.code)
+    )
+    if active is not None:
+        stmt = stmt.where(PromoCode.is_active.is_(active))
+    if code:
+        stmt = stmt.where(PromoCode.code == code.upper())
+
+    for (code, discount_type, discount_value, times_used, max_uses, subscriptions,
+         is_active, valid_until, description) in db.execute(stmt.execution_options(yield_per=YIELD_PER)):
+        discount = f"{discount_value:g}%" if discount_type == "percent" else f"${discount_value:g}"
+        yield {
+            "code": code,
+            "discount": discount,
+            "times_used": times_used,
+            "max_uses": max_uses if max_uses is not None else "unlimited",
+            "subscriptions": subscriptions,
+            "is_active": is_active,
+            "valid_until": _value(valid_until),
+            "description": description,
+        }
+
+
+def write_json_rows(rows: Iterator[dict], out) -> int:
+    """Write a JSON array one element at a time"""
+    count = 0
+    out.write("[")
+    for row in rows:
+        out.write(",\n  " if count else "\n  ")
+        out.write(json.dumps(row, default=str))
+        count += 1
+    out.write("\n]\n" if count else "]\n")
+    return count
+
+
+def write_table(rows: Iterator[dict], columns, out) -> int:
+    """Fixed-width table; widths are set up front so rows can be streamed"""
+    def cell(value, width):
+        text = "" if value is None else str(value)
+        return (text[: width - 1] + "…" if len(text) > width else text).ljust(width)
+
+    out.write("  ".join(cell(name, width) for name, width in columns).rstrip() + "\n")
+    out.write("  ".join("-" * width for _, width in columns) + "\n")
+    count = 0
+    for row in rows:
+        out.write("  ".join(cell(row[name], width) for name, width in columns).rstrip() + "\n")
+        count += 1
+    return count
+
+
+def write_summary_table(data: dict, out):
+    users = data["users"]
+    out.write(f"\n👥 USERS: {users['total']} total, {users['active']} active, {users['verified']} verified\n")
+    out.write("\n💳 SUBSCRIPTIONS BY STATUS:\n")
+    for status, count in sorted(data["subscriptions_by_status"].items(), key=lambda item: -item[1]):
+        out.write(f"  {str(status):<12} {count:>8}\n")
+    out.write("\n📦 USERS PER PLAN:\n")
+    for plan, count in sorted(data["users_per_plan"].items(), key=lambda item: -item[1]):
+        out.write(f"  {str(plan):<12} {count:>8}\n")
+    out.write(f"\n💰 MRR (active + trialing): ${data['monthly_recurring_revenue']:,.2f}\n")
+    promos = data["promo_codes"]
+    out.write(f"\n🎟️  PROMO CODES: {promos['total']} total, {promos['active']} active, {promos['redemptions']} redemptions\n\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Admin reports for the ShopBot database")
+    parser.add_argument("--format", choices=("table", "json"), default="table")
+    commands = parser.add_subparsers(dest="command")
+
+    summary_parser = commands.add_parser("summary", help="headline counts (default)")
+    summary_parser.add_argument("--format", choices=("table", "json"), default=argparse.SUPPRESS)
+
+    users_parser = commands.add_parser("users", help="users with their subscription")
+    users_parser.add_argument("--format", choices=("table", "json"), default=argparse.SUPPRESS)
+    users_parser.add_argument("--status", help="subscription status, e.g. active, trialing, canceled")
+    users_parser.add_argument("--plan", help="plan name, e.g. basic")
+    users_parser.add_argument("--since", type=datetime.fromisoformat, help="created on or after (ISO date)")
+    users_parser.add_argument("--email", help="email contains")
+    users_parser.add_argument("--limit", type=int)
+
+    promos_parser = commands.add_parser("promos", help="promo codes and their usage")
+    promos_parser.add_argument("--format", choices=("table", "json"), default=argparse.SUPPRESS)
+    active = promos_parser.add_mutually_exclusive_group()
+    active.add_argument("--active", dest="active", action="store_const", const=True)
+    active.add_argument("--inactive", dest="active", action="store_const", const=False)
+    promos_parser.add_argument("--code")
+
+    args = parser.parse_args(argv)
+    command = args.command or "summary"
+    out = sys.stdout
+
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        if command == "summary":
+            data = summary(db)
+            if args.format == "json":
+                out.write(json.dumps(data, indent=2, default=str) + "\n")
+            else:
+                write_summary_table(data, out)
+            return 0
+
+        if command == "users":
+            rows = iter_users(db, args.status, args.plan, args.since, args.email, args.limit)
+            columns = USER_COLUMNS
+        else:
+            rows = iter_promos(db, args.active, args.code)
+            columns = PROMO_COLUMNS
+
+        if args.format == "json":
+            write_json_rows(rows, out)
+        else:
+            count = write_table(rows, columns, out)
+            print(f"\n{count} row(s)", file=sys.stderr)
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""
+Fast JSON path for hot routes
+
+- FastJSONResponse renders with orjson (falls back to the stdlib when
+  orjson is not installed) and is the app's default response class.
+- FastJSONRoute parses request bodies with orjson. Routers opt in with
+  APIRouter(route_class=FastJSONRoute).
+- model_response() turns a response model into JSON bytes directly,
+  skipping FastAPI's re-validation and jsonable_encoder pass. The
+  route's response_model still documents the schema in OpenAPI.
+"""
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONRequest(Request):
+    """Request whose .json() uses orjson (its JSONDecodeError subclasses json's)"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            self._json = orjson.loads(body) if orjson is not None else await super().json()
+        return self._json
+
+
+class FastJSONRoute(APIRoute):
+    """Route class that parses JSON bodies with orjson"""
+
+    def get_route_handler(self) -> Callable:
+        original_handler = super().get_route_handler()
+
+        async def handler(request: Request) -> Response:
+            return await original_handler(FastJSONRequest(request.scope, request.receive))
+
+        return handler
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize an already-valid response model straight to JSON bytes"""
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json"
+    )
@@ -0,0 +1,192 @@
+"""
+Retention and archival for conversations and messages
+
+Conversations whose activity all lies before the retention cutoff
+(started, ended, and every message sent before it) are moved out of
+the hot tables in batches. Conversations that never ended stay in place. Each batch is written as one gzip-compressed
+JSONL file (one conversation with its messages per line), then the rows
+are deleted in a single transaction.
+
+The cutoff never passes the dashboard rollup watermark, so nothing is
+archived before app/analytics.py has counted its messages and outcome. Without a watermark
+(rollups have never run) nothing is archived at all.
+
+    python -m app.retention --days 365 --dry-run
+    python -m app.retention --days 365 --archive-dir /data/archive
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+
+from app.analytics import get_watermark
+from app.config import get_settings
+from app.models import Conversation, Message
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CONVERSATION_FIELDS = (
+    "id", "user_id", "store_id", "customer_email", "customer_name", "customer_ip",
+    "status", "rating", "extra_data", "started_at", "ended_at",
+)
+MESSAGE_FIELDS = ("id", "role", "content", "model_used", "tokens_used", "intent", "timestamp")
+
+
+def _serialize(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def retention_cutoff(db: Session, days: int, now: datetime | None = None) -> datetime | None:
+    """Archive conversations whose activity ended before this moment; None when rollups have never run"""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    watermark = get_watermark(db)
+    if watermark is None:
+        logger.warning("Rollups have never run (python -m app.analytics); not archiving anything")
+        return None
+    if watermark < cutoff:
+        logger.warning("Rollups only reach %s; holding retention back to it", watermark)
+        cutoff = watermark
+    return cutoff
+
+
+def _archive_path(archive_dir: str, first_started: datetime) -> str:
+    directory = os.path.join(archive_dir, "conversations", f"{first_started:%Y}", f"{first_started:%m}")
+    os.makedirs(directory, exist_ok=True)
+    name = f"conversations-{first_started:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+    return os.path.join(directory, name)
+
+
+def _write_archive(path: str, conversations, messages) -> int:
+    """Write the batch to a temp file and rename it into place once complete"""
+    by_conversation = {}
+    for message in messages:
+        by_conversation.setdefault(message.conversation_id, []).append(
+            {field: _serialize(getattr(message, field)) for field in MESSAGE_FIELDS}
+        )
+
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+        for conversation in conversations:
+            record = {field: _serialize(getattr(conversation, field)) for field in CONVERSATION_FIELDS}
+            record["messages"] = by_conversation.get(conversation.id, [])
+            f.write(json.dumps(record, separators=(",", ":")))
+            f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int, archive_dir: str, dry_run: bool = False) -> dict | None:
+    """Archive and delete up to `batch_size` conversations; None when nothing is left"""
+    # A conversation that started long ago can still be active: its outcome
+    # (ended_at) or newer messages may not be rolled up yet
+    newer_message = exists().where(Message.conversation_id == Conversation.id, Message.timestamp >= cutoff)
+    conversations = db.execute(
+        select(*(getattr(Conversation, field) for field in CONVERSATION_FIELDS))
+        .where(
+            Conversation.started_at < cutoff,
+            Conversation.ended_at.isnot(None),
+            Conversation.ended_at < cutoff,
+            ~newer_message,
+        )
+        .order_by(Conversation.started_at)
+        .limit(batch_size)
+    ).all()
+    if not conversations:
+        return None
+
+    ids = [conversation.id for conversation in conversations]
+    messages = db.execute(
+        select(Message.conversation_id, *(getattr(Message, field) for field in MESSAGE_FIELDS))
+        .where(Message.conversation_id.in_(ids))
+        .order_by(Message.conversation_id, Message.timestamp)
+    ).all()
+
+    result = {
+        "conversations": len(conversations),
+        "messages": len(messages),
+        "oldest": conversations[0].started_at,
+        "newest": conversations[-1].started_at,
+    }
+    if dry_run:
+        db.rollback()
+        return result
+
+    path = _archive_path(archive_dir, conversations[0].started_at)
+    result["file"] = path
+    result["bytes"] = _write_archive(path, conversations, messages)
+
+    # Only delete once the archive file is safely on disk
+    db.execute(delete(Message).where(Message.conversation_id.in_(ids)))
+    db.execute(delete(Conversation).where(Conversation.id.in_(ids)))
+    db.commit()
+    return result
+
+
+def run_retention(
+    db: Session,
+    days: int | None = None,
+    batch_size: int | None = None,
+    archive_dir: str | None = None,
+    max_batches: int | None = None,
+    dry_run: bool = False,
+    now: datetime | None = None,
+) -> dict:
+    """Archive everything older than the retention period, batch by batch"""
+    days = days if days is not None else settings.retention_days
+    batch_size = batch_size or settings.retention_batch_size
+    archive_dir = archive_dir or settings.archive_dir
+    cutoff = retention_cutoff(db, days, now)
+
+    totals = {"cutoff": cutoff, "batches": 0, "conversations": 0, "messages": 0, "bytes": 0, "files": []}
+    while cutoff is not None and (max_batches is None or totals["batches"] < max_batches):
+        batch = archive_batch(db, cutoff, batch_size, archive_dir, dry_run=dry_run)
+        if batch is None:
+            break
+        totals["batches"] += 1
+        totals["conversations"] += batch["conversations"]
+        totals["messages"] += batch["messages"]
+        totals["bytes"] += batch.get("bytes", 0)
+        if "file" in batch:
+            totals["files"].append(batch["file"])
+            logger.info("Archived %s conversations to %s", batch["conversations"], batch["file"])
+        if dry_run:
+            # Nothing was deleted, so the next batch would be the same rows
+            break
+    return totals
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Archive old conversations to gzip JSONL and delete them")
+    parser.add_argument("--days", type=int, default=settings.retention_days, help="keep this many days in the hot tables")
+    parser.add_argument("--batch-size", type=int, default=settings.retention_batch_size)
+    parser.add_argument("--archive-dir", default=settings.archive_dir)
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    parser.add_argument("--dry-run", action="store_true", help="report the first batch without writing or deleting")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        result = run_retention(
+            db, days=args.days, batch_size=args.batch_size, archive_dir=args.archive_dir,
+            max_batches=args.max_batches, dry_run=args.dry_run,
+        )
+    finally:
+        db.close()
+    result["files"] = len(result["files"])
+    print(json.dumps(result, default=str, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Header, Request
+from fastapi.responses import PlainTextResponse
+from app.config import get_settings
+import secrets
+
+router = APIRouter()
+settings = get_settings()
+
+
+def is_admin(x_admin_token: str | None) -> bool:
+    """True for the configured admin token; always False when ADMIN_TOKEN is not set"""
+    if not settings.admin_token or not x_admin_token:
+        return False
+    return secrets.compare_digest(x_admin_token.encode(), settings.admin_token.encode())
+
+
+def require_admin(x_admin_token: str | None):
+    """Reject requests without the admin token (admin endpoints are closed when none is configured)"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def get_sampler(request: Request):
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    return request.app.state.stack_sampler
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def get_profile(
+    request: Request,
+    route: str | None = None,
+    x_admin_token: str | None = Header(default=None)
+):
+    """
+    Aggregated collapsed-stack samples of all profiled requests
+
+    Feed the output to flamegraph.pl or speedscope. Each stack is rooted
+    at "METHOD /route" so routes show up as separate towers.
+    """
+    require_admin(x_admin_token)
+    return PlainTextResponse(get_sampler(request).collapsed(route))
+
+
+@router.get("/profile/recent")
+async def get_recent_profiles(request: Request, x_admin_token: str | None = Header(default=None)):
+    """Most recent profiled requests (newest first)"""
+    require_admin(x_admin_token)
+    return {"profiles": get_sampler(request).recent()}
+
+
+@router.delete("/profile")
+async def reset_profile(request: Request, x_admin_token: str | None = Header(default=None)):
+    """Clear collected profiles"""
+    require_admin(x_admin_token)
+    get_sampler(request).reset()
+    return {"status": "reset"}
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.analytics import store_summary
+from app.auth import get_current_user_id
+from app.database import get_db
+from app.export import stream_export
+from app.models import Store
+
+router = APIRouter()
+
+
+def get_owned_store(store_id: str, db: Session, user_id: str) -> Store:
+    """Load a store and make sure it belongs to the authenticated user"""
+    store = db.query(Store).filter(Store.id == store_id).first()
+    if not store or store.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Store not found")
+    return store
+
+
+@router.get("/stores/{store_id}/summary")
+async def get_store_summary(
+    store_id: str,
+    days: int = Query(default=30, ge=1, le=366),
+    granularity: str = Query(default="day", pattern="^(day|hour)$"),
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Dashboard analytics for a store
+    
+    Message counts, tokens, intent mix, average rating and resolution /
+    escalation rates. Reads only the pre-aggregated rollup tables, so the
+    cost does not grow with the size of `messages`.
+    
+    Ratings and resolved/escalated status count in the bucket of the
+    conversation's ended_at, and only if they were set by the time that
+    bucket was rolled up; later changes do not show here.
+    """
+    get_owned_store(store_id, db, user_id)
+    
+    end = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    start = end - timedelta(days=days)
+    if granularity == "day":
+        start = start.replace(hour=0)
+    
+    return store_summary(db, store_id, start, end, granularity)
+
+
+@router.get("/stores/{store_id}/export")
+async def export_conversations(
+    store_id: str,
+    format: str = Query(default="jsonl", pattern="^(csv|jsonl)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    gzip: bool = True,
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Download a store's conversations and transcripts as CSV or JSONL
+    
+    Streamed straight from a database cursor and gzip-compressed on the
+    fly, so large stores do not need to fit in memory. `start` / `end`
+    filter on when the conversation started.
+    """
+    get_owned_store(store_id, db, user_id)
+    
+    filename = f"conversations-{store_id}.{format}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else ("text/csv" if format == "csv" else "application/x-ndjson")
+    # The sync generator runs in the threadpool, off the event loop
+    return StreamingResponse(
+        stream_export(store_id, format, start, end, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-from anthropic import Anthropic
+from app.clients import get_anthropic_client
 from app.config import get_settings
+from app.database import SessionLocal
+from app.metrics import ANTHROPIC_LATENCY, ANTHROPIC_TTFT, ANTHROPIC_ERRORS, record_anthropic_usage
+from app.models import Store
+from app.prefilter import client_ip, rejection_response, screen_message
+from app.responses import FastJSONResponse, FastJSONRoute, model_response
+from app.routing import RoutingRules, route_turn
 from typing import List, Optional
+import asyncio
 import json
+import time
 
-router = APIRouter()
+# Hot path: orjson request parsing and responses
+router = APIRouter(route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 settings = get_settings()
 
-# Initialize Anthropic client
-anthropic_client = Anthropic(api_key=settings.anthropic_api_key)
-
 
 class Message(BaseModel):
     role: str  # "user" or "assistant"
@@ -21,6 +27,8 @@ class ChatRequest(BaseModel):
     message: str
     conversation_history: Optional[List[Message]] = []
     store_context: Optional[dict] = None
+    store_key: Optional[str] = None  # the store's public key from the embed code
+
 
 
 class ChatResponse(BaseModel):
@@ -64,57 +72,153 @@ GUIDELINES:
 Remember: You represent {store_context['store_name']} - maintain their brand voice and be helpful!"""
 
 
+def build_chat_params(
+    store_context: dict,
+    conversation_history: list,
+    message: str,
+    model: str | None = None,
+    max_tokens: int | None = None,
+    temperature: float | None = None
+) -> dict:
+    """
+    Claude request for one chat turn
+
+    Shared by /message and the offline evaluation runner (app/evaluation.py)
+    so both send exactly the same prompt. History items may be `Message`
+    models or plain dicts.
+    """
+    messages = []
+    
+    # Add conversation history
+    for msg in conversation_history or []:
+        if isinstance(msg, dict):
+            messages.append({"role": msg["role"], "content": msg["content"]})
+        else:
+            messages.append({"role": msg.role, "content": msg.content})
+    
+    # Add current user message
+    messages.append({"role": "user", "content": message})
+    
+    return {
+        "model": model or settings.default_ai_model,
+        "max_tokens": max_tokens or settings.max_tokens,
+        "temperature": settings.temperature if temperature is None else temperature,
+        "system": build_system_prompt(store_context),
+        "messages": messages,
+    }
+
+
+def create_message(operation: str, **params):
+    """
+    Call Claude through the streaming API and record latency metrics
+
+    Streaming lets us measure time-to-first-token; the final message
+    (with `usage`) is returned exactly like `messages.create` would.
+    """
+    model = params["model"]
+    start = time.perf_counter()
+    first_token_seen = False
+    output_tokens = None
+    try:
+        with get_anthropic_client().messages.stream(**params) as stream:
+            for event in stream:
+                if event.type == "content_block_delta" and not first_token_seen:
+                    first_token_seen = True
+                    ANTHROPIC_TTFT.observe(time.perf_counter() - start, model, operation)
+                elif event.type == "message_delta":
+                    # The final output token count only arrives on message_delta
+                    output_tokens = event.usage.output_tokens
+            response = stream.get_final_message()
+    except Exception:
+        ANTHROPIC_ERRORS.inc(model, operation)
+        raise
+    finally:
+        ANTHROPIC_LATENCY.observe(time.perf_counter() - start, model, operation)
+    
+    if output_tokens is not None:
+        response.usage.output_tokens = output_tokens
+    record_anthropic_usage(model, response.usage)
+    return response
+
+
+def prefilter(http_request: Request, message: str, history: list | None = None):
+    """Reject spam, floods and injection attempts locally (app/prefilter.py), before any Claude call"""
+    peer = http_request.client.host if http_request.client else None
+    reason = screen_message(
+        message,
+        client_ip(peer, ",".join(http_request.headers.getlist("x-forwarded-for"))),
+        http_request.url.path,
+        history=((item.role, item.content) for item in history or [])
+    )
+    if reason is not None:
+        status_code, detail = rejection_response(reason)
+        raise HTTPException(status_code=status_code, detail=detail)
+
+
+def load_routing_rules(store_key: str) -> RoutingRules | None:
+    """Routing rules for an active store (overrides in Store.business_info), or None if there is no such store"""
+    db = SessionLocal()
+    try:
+        store = (
+            db.query(Store)
+            .filter(Store.public_key == store_key, Store.is_active.isnot(False))
+            .first()
+        )
+        return RoutingRules.for_store(store) if store else None
+    finally:
+        db.close()
+
+
 @router.post("/message", response_model=ChatResponse)
-async def send_message(request: ChatRequest):
+async def send_message(request: ChatRequest, http_request: Request):
     """
     Send a message and get AI response
     
     This endpoint:
     1. Takes user message + conversation history
-    2. Adds store context
-    3. Calls Claude API
-    4. Returns AI response
+    2. Rejects spam and abuse locally (app/prefilter.py)
+    3. Adds store context
+    4. Picks the fast or full model (app/routing.py)
+    5. Calls Claude API
+    6. Returns AI response
     """
     
+    prefilter(http_request, request.message, request.conversation_history)
+    
+    # Routing overrides come from the store row, never from the request body
+    rules = None
+    if request.store_key:
+        rules = await asyncio.to_thread(load_routing_rules, request.store_key)
+        if rules is None:
+            raise HTTPException(status_code=404, detail="Store not found")
+    
     try:
         # Use provided store context or default
         store_context = request.store_context or DEFAULT_STORE_CONTEXT
         
-        # Build system prompt
-        system_prompt = build_system_prompt(store_context)
-        
-        # Format conversation history for Claude
-        messages = []
-        
-        # Add conversation history
-        for msg in request.conversation_history:
-            messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-        
-        # Add current user message
-        messages.append({
-            "role": "user",
-            "content": request.message
-        })
+        # Fast model for simple turns, full model for the rest
+        route = route_turn(request.message, len(request.conversation_history or []), rules)
         
         # Call Claude API
-        response = anthropic_client.messages.create(
-            model=settings.default_ai_model,
-            max_tokens=settings.max_tokens,
-            temperature=settings.temperature,
-            system=system_prompt,
-            messages=messages
+        response = create_message(
+            "message",
+            **build_chat_params(
+                store_context,
+                request.conversation_history,
+                request.message,
+                model=route.model,
+                max_tokens=route.max_tokens
+            )
         )
         
         # Extract response text
         assistant_message = response.content[0].text
         
-        return ChatResponse(
+        # Already a valid ChatResponse - skip FastAPI's re-validation
+        return model_response(ChatResponse(
             response=assistant_message,
             conversation_id=None  # We'll add conversation tracking later
-        )
+        ))
         
     except Exception as e:
         raise HTTPException(
@@ -124,7 +228,7 @@ async def send_message(request: ChatRequest):
 
 
 @router.post("/demo", response_model=ChatResponse)
-async def demo_chat(request: ChatRequest):
+async def demo_chat(request: ChatRequest, http_request: Request):
     """
     Demo endpoint that shows how the chatbot works
     Same as /message but with demo context
@@ -132,20 +236,24 @@ async def demo_chat(request: ChatRequest):
     
     # Force demo context
     request.store_context = DEFAULT_STORE_CONTEXT
+    request.store_key = None
     
-    return await send_message(request)
+    return await send_message(request, http_request)
 
 
 # Intent detection endpoint (for debugging/testing)
 @router.post("/detect-intent")
-async def detect_intent(message: str):
+async def detect_intent(message: str, http_request: Request):
     """
     Detect the intent of a user message
     Useful for routing and analytics
     """
     
+    prefilter(http_request, message)
+    
     try:
-        response = anthropic_client.messages.create(
+        response = create_message(
+            "detect_intent",
             model=settings.default_ai_model,
             max_tokens=100,
             messages=[{
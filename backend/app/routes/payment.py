@@ -2,19 +2,17 @@ from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-import stripe
 
+from app.clients import get_stripe
 from app.config import get_settings
 from app.database import get_db
 from app.models import User, Subscription, PromoCode
 from app.auth import hash_password, create_access_token
+from app.metrics import time_stripe
 
 settings = get_settings()
 router = APIRouter()
 
-# Initialize Stripe
-stripe.api_key = settings.stripe_secret_key
-
 
 class RegisterRequest(BaseModel):
     email: EmailStr
@@ -104,6 +102,8 @@ async def create_checkout_session(
     Create Stripe checkout session for subscription
     """
     
+    stripe = get_stripe()
+    
     # Get the most recent user (for testing - improve this later)
     user = db.query(User).order_by(User.created_at.desc()).first()
     if not user:
@@ -132,23 +132,25 @@ async def create_checkout_session(
             
             # Create Stripe coupon
             if promo.discount_type == "percent":
-                promo_discount = stripe.Coupon.create(
-                    percent_off=promo.discount_value,
-                    duration="repeating" if promo.duration_months else "once",
-                    duration_in_months=promo.duration_months if promo.duration_months else 1,
-                    name=f"{promo.code} - {promo.discount_value}% off"
-                )
+                with time_stripe("coupon.create"):
+                    promo_discount = stripe.Coupon.create(
+                        percent_off=promo.discount_value,
+                        duration="repeating" if promo.duration_months else "once",
+                        duration_in_months=promo.duration_months if promo.duration_months else 1,
+                        name=f"{promo.code} - {promo.discount_value}% off"
+                    )
     
     # Create or get Stripe customer
     if not user.subscription or not user.subscription.stripe_customer_id:
-        customer = stripe.Customer.create(
-            email=user.email,
-            name=user.full_name,
-            metadata={
-                "user_id": user.id,
-                "company": user.company_name or ""
-            }
-        )
+        with time_stripe("customer.create"):
+            customer = stripe.Customer.create(
+                email=user.email,
+                name=user.full_name,
+                metadata={
+                    "user_id": user.id,
+                    "company": user.company_name or ""
+                }
+            )
         customer_id = customer.id
     else:
         customer_id = user.subscription.stripe_customer_id
@@ -158,7 +160,7 @@ async def create_checkout_session(
         "customer": customer_id,
         "payment_method_types": ["card"],
         "line_items": [{
-            "price": settings.stripe_price_id_basic,
+            "price": settings.require("stripe_price_id_basic"),
             "quantity": 1,
         }],
         "mode": "subscription",
@@ -177,7 +179,8 @@ async def create_checkout_session(
     if promo_discount:
         checkout_params["discounts"] = [{"coupon": promo_discount.id}]
     
-    session = stripe.checkout.Session.create(**checkout_params)
+    with time_stripe("checkout.session.create"):
+        session = stripe.checkout.Session.create(**checkout_params)
     
     return {
         "checkout_url": session.url,
@@ -225,6 +228,7 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
     Updates subscription status based on Stripe events
     """
     
+    stripe = get_stripe()
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
     
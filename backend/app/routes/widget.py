@@ -0,0 +1,68 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import Optional
+import asyncio
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.widget import WidgetConfig, load_config, normalize_domain, widget_cache
+
+router = APIRouter()
+settings = get_settings()
+
+
+def _load(kind: str, value: str) -> WidgetConfig | None:
+    db = SessionLocal()
+    try:
+        return load_config(db, kind, value)
+    finally:
+        db.close()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/"x" matches "x" """
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+@router.get("/bootstrap")
+async def widget_bootstrap(request: Request, key: Optional[str] = None, domain: Optional[str] = None):
+    """
+    Configuration for the embedded chat widget
+
+    Look the store up by `key` (its public key from the embed code) or by
+    `domain`. Served from memory as pre-serialized bytes with a strong
+    ETag; send it back in If-None-Match to get an empty 304.
+    """
+    if key:
+        kind, value = "key", key
+    elif domain:
+        kind, value = "domain", normalize_domain(domain)
+    else:
+        raise HTTPException(status_code=400, detail="Pass the store's public key or domain")
+
+    found, config = widget_cache.get(kind, value)
+    if not found:
+        # Cache miss: one indexed query, off the event loop
+        version = widget_cache.version
+        config = await asyncio.to_thread(_load, kind, value)
+        widget_cache.put(kind, value, config, version)
+    if config is None:
+        raise HTTPException(status_code=404, detail="Store not found")
+
+    headers = {
+        "ETag": config.etag,
+        "Cache-Control": f"public, max-age={settings.widget_max_age_seconds}",
+        # Public data, embedded on any storefront
+        "Access-Control-Allow-Origin": "*",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, config.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=config.body, media_type="application/json", headers=headers)
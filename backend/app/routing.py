@@ -0,0 +1,209 @@
+"""
+Tiered model routing for chat turns
+
+Simple FAQ-style turns ("hi", "what's your shipping cost?") go to a fast,
+cheap model with a tight max_tokens. Complaints, long or multi-part
+questions and long conversations go to the full model. The decision uses
+only cheap local features (length, question count, history depth,
+keywords and a regex intent classifier), so it adds microseconds, not
+another LLM call.
+
+Defaults come from settings. A store can override rules under the
+"routing" key of its server-side Store.business_info JSON (never from
+the chat request), e.g.:
+
+    {"routing": {"fast_max_tokens": 200, "max_fast_chars": 120,
+                 "escalation_keywords": ["warranty", "allergic"]}}
+
+Overrides are type-checked; models are limited to FAST_AI_MODEL and
+DEFAULT_AI_MODEL and max_tokens to MAX_TOKENS.
+"""
+import json
+import logging
+import re
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+
+from app.config import get_settings
+from app.metrics import CHAT_ROUTES
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FAST = "fast"
+FULL = "full"
+
+# Same labels as /api/chat/detect-intent; checked in order, first match wins
+INTENT_PATTERNS = (
+    ("complaint", re.compile(
+        r"\b(broken|damaged|defective|terrible|awful|worst|angry|furious|disappointed|unacceptable|"
+        r"ridiculous|scam|fraud|never (arrived|came|received)|still (haven'?t|not)|wrong (item|size|order))\b", re.I)),
+    ("order_tracking", re.compile(r"\b(track(ing)?|where('?s| is) my|order status|order number|shipped yet|has it shipped)\b", re.I)),
+    ("return_question", re.compile(r"\b(return|exchange|refund|send (it|them) back)\w*", re.I)),
+    ("shipping_question", re.compile(r"\b(ship(ping)?|deliver(y|ed)?|postage|express|next day|arrive)\w*", re.I)),
+    ("product_question", re.compile(
+        r"\b(sizes?|colou?rs?|materials?|fabrics?|cotton|in stock|available|fits?|prices?|costs?|how much|"
+        r"in (x{0,2}s|m|x{0,3}l|small|medium|large))\b", re.I)),
+)
+GREETING = re.compile(r"^\W*(hi|hello|hey|yo|thanks|thank you|ok(ay)?|cool|great|bye|good (morning|afternoon|evening))\b[\W\w]{0,20}$", re.I)
+DEFAULT_ESCALATION_KEYWORDS = (
+    "refund", "chargeback", "lawyer", "legal", "cancel my", "speak to a human", "manager",
+    "allergic", "injury", "unsafe",
+)
+
+
+@lru_cache(maxsize=256)
+def _keyword_pattern(keywords: tuple) -> re.Pattern | None:
+    """One compiled alternation per distinct keyword list (stores rarely change theirs)"""
+    if not keywords:
+        return None
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords), re.I)
+
+
+def classify_intent(message: str) -> str:
+    """Cheap local intent guess, used for routing and analytics"""
+    if GREETING.match(message):
+        return "general_inquiry"
+    for intent, pattern in INTENT_PATTERNS:
+        if pattern.search(message):
+            return intent
+    return "general_inquiry"
+
+
+@dataclass(frozen=True)
+class RoutingRules:
+    """Thresholds for one store; anything not overridden comes from settings"""
+    enabled: bool = True
+    fast_model: str = ""
+    full_model: str = ""
+    fast_max_tokens: int = 300
+    full_max_tokens: int = 1000
+    max_fast_chars: int = 200  # longer messages go to the full model
+    max_fast_questions: int = 1  # more "?" than this is a multi-part question
+    max_fast_history: int = 6  # previous messages; deep conversations stay on the full model
+    fast_intents: tuple = ("general_inquiry", "shipping_question", "return_question", "order_tracking", "product_question")
+    full_intents: tuple = ("complaint",)
+    escalation_keywords: tuple = DEFAULT_ESCALATION_KEYWORDS
+
+    @classmethod
+    def defaults(cls) -> "RoutingRules":
+        return cls(
+            enabled=settings.routing_enabled,
+            fast_model=settings.fast_ai_model,
+            full_model=settings.default_ai_model,
+            fast_max_tokens=settings.fast_max_tokens,
+            full_max_tokens=settings.max_tokens,
+        )
+
+    @classmethod
+    def from_overrides(cls, overrides) -> "RoutingRules":
+        """
+        Defaults with a store's overrides applied
+
+        Unknown rules and values of the wrong type are logged and ignored.
+        Models must be one of the configured models; max_tokens values are
+        clamped to 1..MAX_TOKENS and other counts to >= 0.
+        """
+        rules = _default_rules()
+        if not overrides:
+            return rules
+        if not isinstance(overrides, dict):
+            logger.warning("Ignoring routing overrides: expected an object, got %s", type(overrides).__name__)
+            return rules
+        known = {field.name for field in fields(cls)}
+        allowed_models = {settings.fast_ai_model, settings.default_ai_model}
+        values = {}
+        for name, value in overrides.items():
+            if name not in known:
+                logger.warning("Ignoring unknown routing rule %r", name)
+                continue
+            default = getattr(rules, name)
+            if isinstance(default, bool):
+                valid = isinstance(value, bool)
+            elif isinstance(default, int):
+                valid = isinstance(value, int) and not isinstance(value, bool)
+                if valid:
+                    value = min(max(value, 1), settings.max_tokens) if name.endswith("max_tokens") else max(value, 0)
+            elif isinstance(default, str):
+                valid = value in allowed_models
+            else:
+                valid = isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value)
+                if valid:
+                    value = tuple(value)
+            if not valid:
+                logger.warning("Ignoring invalid routing rule %s=%r", name, value)
+                continue
+            values[name] = value
+        return replace(rules, **values)
+
+    @classmethod
+    def for_store(cls, store) -> "RoutingRules":
+        """Rules for a Store row (overrides under "routing" in its business_info JSON)"""
+        if store is None or not store.business_info:
+            return _default_rules()
+        return _rules_from_business_info(store.business_info)
+
+
+@lru_cache(maxsize=1024)
+def _rules_from_business_info(business_info: str) -> RoutingRules:
+    """Parsed once per distinct business_info text"""
+    try:
+        info = json.loads(business_info)
+    except ValueError:
+        logger.warning("Ignoring routing overrides: business_info is not valid JSON")
+        return _default_rules()
+    return RoutingRules.from_overrides(info.get("routing") if isinstance(info, dict) else None)
+
+
+@lru_cache()
+def _default_rules() -> RoutingRules:
+    return RoutingRules.defaults()
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    route: str
+    model: str
+    max_tokens: int
+    intent: str
+    reason: str
+
+
+def choose_route(message: str, history_length: int, rules: RoutingRules) -> tuple[str, str, str]:
+    """(route, reason, intent) from message features; no I/O"""
+    intent = classify_intent(message)
+    if not rules.enabled:
+        return FULL, "disabled", intent
+    if intent in rules.full_intents:
+        return FULL, f"intent:{intent}", intent
+    keywords = _keyword_pattern(rules.escalation_keywords)
+    if keywords is not None and keywords.search(message):
+        return FULL, "keyword", intent
+    if len(message) > rules.max_fast_chars:
+        return FULL, "long_message", intent
+    if message.count("?") > rules.max_fast_questions:
+        return FULL, "multi_question", intent
+    if history_length > rules.max_fast_history:
+        return FULL, "long_history", intent
+    if intent in rules.fast_intents:
+        return FAST, f"intent:{intent}", intent
+    return FULL, "default", intent
+
+
+def route_turn(message: str, history_length: int, rules: RoutingRules | None = None, log: bool = True) -> RouteDecision:
+    """Pick the model and max_tokens for one chat turn and log the decision"""
+    rules = rules or _default_rules()
+    route, reason, intent = choose_route(message, history_length, rules)
+    if route == FAST:
+        decision = RouteDecision(route, rules.fast_model, rules.fast_max_tokens, intent, reason)
+    else:
+        decision = RouteDecision(route, rules.full_model or settings.default_ai_model, rules.full_max_tokens, intent, reason)
+
+    if not log:
+        return decision
+    CHAT_ROUTES.inc(decision.route, decision.reason)
+    logger.info(
+        "chat route=%s model=%s max_tokens=%s intent=%s reason=%s chars=%s history=%s",
+        decision.route, decision.model, decision.max_tokens, intent, reason, len(message), history_length,
+    )
+    return decision
@@ -0,0 +1,188 @@
+"""
+Widget bootstrap configuration with an in-process store cache
+
+The embed script loads its configuration on every storefront page view,
+which is far more often than anyone chats. Each store's configuration is
+serialized to JSON bytes once, along with a strong ETag, and kept in a
+bounded in-memory cache. The cache is keyed by public key and by domain.
+Cache hits do not touch the database or re-encode anything.
+
+Entries are dropped when the store row changes (SQLAlchemy events, after
+the commit) and expire after WIDGET_CACHE_TTL_SECONDS. The TTL covers
+updates made by other processes. Unknown keys are cached as misses for
+a short time so junk traffic cannot hammer the database.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.metrics import record_cache
+from app.models import Store, normalize_domain
+from app.responses import orjson
+
+settings = get_settings()
+
+NEGATIVE_TTL_SECONDS = 30
+
+DEFAULT_WIDGET_SETTINGS = {
+    "position": "bottom-right",
+    "primary_color": "#4F46E5",
+    "greeting": "Hi! How can I help you today?",
+    "placeholder": "Type your message...",
+}
+
+
+@dataclass(frozen=True)
+class WidgetConfig:
+    store_id: str
+    public_key: str
+    domain: str | None
+    body: bytes
+    etag: str
+
+
+def build_config(store: Store) -> WidgetConfig:
+    """Serialize a store's public widget configuration once"""
+    widget_settings = dict(DEFAULT_WIDGET_SETTINGS)
+    if store.widget_settings:
+        try:
+            widget_settings.update(json.loads(store.widget_settings))
+        except ValueError:
+            pass  # keep serving defaults rather than breaking the storefront
+    payload = {
+        "store": {
+            "public_key": store.public_key,
+            "name": store.store_name,
+            "domain": store.store_domain,
+        },
+        "widget": widget_settings,
+        "chat_endpoint": "/api/chat/message",
+    }
+    if orjson is not None:
+        body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    else:
+        body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    domain = normalize_domain(store.store_domain) if store.store_domain else None
+    return WidgetConfig(store.id, store.public_key, domain, body, etag)
+
+
+def load_config(db: Session, kind: str, value: str) -> WidgetConfig | None:
+    column = Store.public_key if kind == "key" else Store.store_domain
+    store = (
+        db.query(Store)
+        .filter(column == value, Store.is_active.isnot(False))
+        .first()
+    )
+    return build_config(store) if store else None
+
+
+class WidgetCache:
+    """
+    (kind, value) -> WidgetConfig with TTL and negative entries
+
+    Reads take no lock. When full, the oldest insertion is evicted; entries
+    are re-inserted on every refill, so busy stores stay near the end.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (kind, value) -> (expires_at, config or None)
+        self._keys_by_store = {}  # store_id -> cache keys pointing at it
+        self._lock = threading.Lock()
+        self.version = 0  # bumped by every invalidation
+
+    def get(self, kind: str, value: str):
+        """(found, config); found is False on a miss or an expired entry"""
+        key = (kind, value)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            record_cache("widget", False)
+            return False, None
+        record_cache("widget", True)
+        return True, entry[1]
+
+    def put(self, kind: str, value: str, config: WidgetConfig | None, version: int | None = None):
+        """
+        Cache a loaded config (or None for "no such store")
+
+        Pass the `version` read before loading: if a store was invalidated
+        meanwhile, the loaded row may be stale and is not cached.
+        """
+        ttl = self.ttl if config is not None else min(self.ttl, NEGATIVE_TTL_SECONDS)
+        key = (kind, value)
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._entries[key] = (time.monotonic() + ttl, config)
+            self._entries.move_to_end(key)
+            if config is not None:
+                self._keys_by_store.setdefault(config.store_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                old_key, (_, old_config) = self._entries.popitem(last=False)
+                if old_config is not None:
+                    self._forget(old_config.store_id, old_key)
+
+    def _forget(self, store_id: str, key):
+        keys = self._keys_by_store.get(store_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_store[store_id]
+
+    def invalidate_store(self, store_id: str, public_key: str | None = None, domain: str | None = None):
+        """Drop every entry for a store, plus misses cached for its (new) key or domain"""
+        with self._lock:
+            self.version += 1
+            keys = self._keys_by_store.pop(store_id, set())
+            if public_key:
+                keys.add(("key", public_key))
+            if domain:
+                keys.add(("domain", normalize_domain(domain)))
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._keys_by_store.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+widget_cache = WidgetCache(maxsize=settings.widget_cache_size, ttl=settings.widget_cache_ttl_seconds)
+
+
+# Invalidation: remember changed stores during the flush, drop them once
+# the transaction commits (so a concurrent miss cannot re-cache old data)
+
+def _remember_store(mapper, connection, store: Store):
+    session = Session.object_session(store)
+    widget_cache.invalidate_store(store.id, store.public_key, store.store_domain)
+    if session is not None:
+        session.info.setdefault("widget_stores", {})[store.id] = (store.public_key, store.store_domain)
+
+
+def _invalidate_committed(session: Session):
+    for store_id, (public_key, domain) in session.info.pop("widget_stores", {}).items():
+        widget_cache.invalidate_store(store_id, public_key, domain)
+
+
+def _discard_rolled_back(session: Session, previous_transaction):
+    session.info.pop("widget_stores", None)
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Store, _event_name, _remember_store)
+event.listen(Session, "after_commit", _invalidate_committed)
+event.listen(Session, "after_soft_rollback", _discard_rolled_back)
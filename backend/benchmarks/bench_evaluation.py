@@ -0,0 +1,125 @@
+"""
+Batch evaluation runner against the fake Anthropic server
+
+1. Writes N synthetic cases (a share of them exact duplicates) to JSONL
+2. Sequential baseline: a sample run with concurrency 1
+3. Interrupted run: the first half of the cases with --concurrency
+4. Resume: the full file against the same output, which must skip the
+   finished half
+5. Checks that every case has exactly one successful result and that
+   the fake saw exactly one request per unique prompt
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_evaluation --cases 2000 --concurrency 32 --latency-ms 300
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+
+from benchmarks.fakes import FakeAnthropic, FakeConfig
+from benchmarks.harness import configure_environment
+
+QUESTIONS = [
+    "Where is my order?",
+    "Do you have the Classic White Tee in XL?",
+    "How long does express shipping take?",
+    "Can I return a shirt I already washed?",
+    "Is shipping free over $50?",
+    "What sizes does the Vintage Band Shirt come in?",
+    "My package arrived damaged, what should I do?",
+    "Do you ship to Canada?",
+]
+STORES = [
+    {"store_name": "Bench Tees", "return_policy": "30 days", "shipping_info": "5-7 days, free over $50"},
+    {"store_name": "Bench Outdoors", "return_policy": "60 days", "shipping_info": "3-5 days, $7.99"},
+]
+
+
+def write_cases(path: str, count: int, duplicate_rate: float, seed: int) -> int:
+    """Write cases; returns the number of unique prompts"""
+    rng = random.Random(seed)
+    seen = []
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            if seen and rng.random() < duplicate_rate:
+                case = dict(rng.choice(seen))
+            else:
+                turns = rng.randint(0, 3)
+                history = []
+                for _ in range(turns):
+                    history.append({"role": "user", "content": rng.choice(QUESTIONS)})
+                    history.append({"role": "assistant", "content": "Happy to help with that!"})
+                case = {
+                    "store_context": rng.choice(STORES),
+                    "conversation_history": history,
+                    "message": f"{rng.choice(QUESTIONS)} (order #{rng.randint(1000, 9999)})",
+                }
+                seen.append(case)
+            case["id"] = f"case-{i}"
+            f.write(json.dumps(case) + "\n")
+    return len(seen)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="fake streaming speed (0 = instant)")
+    parser.add_argument("--baseline-cases", type=int, default=20, help="cases in the sequential baseline")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="shopbot-eval-")
+    cases_path = os.path.join(workdir, "cases.jsonl")
+    unique = write_cases(cases_path, args.cases, args.duplicate_rate, args.seed)
+
+    config = FakeConfig(latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second, seed=args.seed)
+    with FakeAnthropic(config) as fake:
+        configure_environment(fake.url, "http://127.0.0.1:9")
+        from app.evaluation import run_evaluation
+
+        baseline = run_evaluation(
+            cases_path, os.path.join(workdir, "baseline.jsonl"), concurrency=1, limit=args.baseline_cases,
+        )
+
+        fake.requests = 0
+        output = os.path.join(workdir, "results.jsonl")
+        first = run_evaluation(cases_path, output, concurrency=args.concurrency, limit=args.cases // 2)
+        resumed = run_evaluation(cases_path, output, concurrency=args.concurrency)
+        requests_seen = fake.requests
+
+    successes = Counter()
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if not record.get("error"):
+                successes[record["case_id"]] += 1
+
+    checks = {
+        "every_case_answered_once": len(successes) == args.cases and set(successes.values()) == {1},
+        "one_request_per_unique_prompt": requests_seen == unique,
+        "resume_skipped_first_half": resumed["skipped"] == first["cases"],
+    }
+    report = {
+        "benchmark": "batch_evaluation",
+        "cases": args.cases,
+        "unique_prompts": unique,
+        "fake_latency_ms": args.latency_ms,
+        "sequential_requests_per_second": baseline["requests_per_second"],
+        "concurrent_requests_per_second": resumed["requests_per_second"],
+        "first_run": first,
+        "resumed_run": resumed,
+        "checks": checks,
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Transcript export benchmark: naive ORM export vs streaming export
+
+For each dataset size, one store's messages are generated into a fresh
+SQLite database and exported as JSONL twice:
+
+- naive:     load every Conversation, touch `conversation.messages`
+             (one lazy load per conversation), build the file in memory
+- streaming: app.export (one joined query, yield_per, incremental gzip)
+
+Reports wall time, SQL statement count and peak Python heap (tracemalloc)
+so it is visible that streaming memory stays flat as the store grows.
+Times include tracemalloc overhead; compare them relative to each other.
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_export --sizes 50000 200000 800000
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def _measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / (1024 * 1024)
+
+
+def run_size(messages: int, seed: int) -> dict:
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+
+    from app.export import export_store
+    from app.models import Base, Conversation
+    from benchmarks import synthetic
+
+    path = os.path.join(tempfile.mkdtemp(prefix="shopbot-export-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    dataset = synthetic.generate(engine, messages, stores=1, days=365, seed=seed)
+    store_id = dataset["store_ids"][0]
+    Session = sessionmaker(bind=engine)
+
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+
+    def naive():
+        db = Session()
+        lines = []
+        for conversation in db.query(Conversation).filter(Conversation.store_id == store_id).order_by(Conversation.started_at):
+            lines.append(json.dumps({
+                "id": conversation.id,
+                "status": conversation.status,
+                "started_at": conversation.started_at.isoformat(),
+                "messages": [
+                    {"role": m.role, "content": m.content, "timestamp": m.timestamp.isoformat()}
+                    for m in conversation.messages
+                ],
+            }))
+        data = gzip.compress("\n".join(lines).encode("utf-8"))
+        db.close()
+        return len(data)
+
+    def streaming():
+        db = Session()
+        size = sum(len(chunk) for chunk in export_store(db, store_id, "jsonl"))
+        db.close()
+        return size
+
+    results = {}
+    for name, func in (("naive", naive), ("streaming", streaming)):
+        statements = 0
+        size, seconds, peak_mb = _measure(func)
+        results[name] = {
+            "seconds": round(seconds, 2),
+            "sql_statements": statements,
+            "peak_heap_mb": round(peak_mb, 1),
+            "output_bytes": size,
+        }
+    engine.dispose()
+    return {"messages": dataset["messages"], "conversations": dataset["conversations"], **results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50_000, 200_000, 800_000], help="messages per run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    runs = []
+    for size in args.sizes:
+        print(f"  exporting {size:,} messages", file=sys.stderr)
+        runs.append(run_size(size, args.seed))
+
+    print(json.dumps({"benchmark": "transcript_export", "runs": runs}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+End-to-end load benchmark, fully offline
+
+Starts fake Anthropic and Stripe servers, boots the app with uvicorn
+against a throwaway SQLite database, drives a weighted traffic mix and
+prints (or writes) a JSON report that can be diffed between runs.
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_load --duration 20 --concurrency 16 --output before.json
+    python -m benchmarks.bench_load --mix chat_turn=1 --llm-latency-ms 800 --tokens-per-second 60
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from dataclasses import asdict
+
+from benchmarks.fakes import FakeAnthropic, FakeConfig, FakeStripe
+from benchmarks.harness import configure_environment, create_schema, peak_rss_mb, rss_mb, serve_app
+from benchmarks.loadgen import DEFAULT_MIX, PROMO_CODE, run_load
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """Parse 'chat_turn=3,demo=1' into a weight dict"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def seed_database():
+    """Data the scenarios expect: a promo code and one user to check out"""
+    from app.auth import hash_password
+    from app.database import SessionLocal
+    from app.models import PromoCode, User
+
+    db = SessionLocal()
+    try:
+        db.add(PromoCode(code=PROMO_CODE, discount_value=50, description="Benchmark promo"))
+        db.add(User(email="seed@example.com", password_hash=hash_password("seed"), full_name="Seed User"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before measuring")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. chat_turn=3,demo=1,webhook=1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="fake Anthropic time to first token")
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="fake Anthropic streaming rate")
+    parser.add_argument("--output-tokens", type=int, default=60)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--stripe-latency-ms", type=float, default=150.0)
+    parser.add_argument("--stripe-error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    llm_config = FakeConfig(
+        latency_ms=args.llm_latency_ms,
+        jitter_ms=args.llm_jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        error_rate=args.llm_error_rate,
+        seed=args.seed,
+    )
+    stripe_config = FakeConfig(latency_ms=args.stripe_latency_ms, error_rate=args.stripe_error_rate, seed=args.seed)
+
+    # The app prints startup banners; keep stdout clean for the JSON report
+    with FakeAnthropic(llm_config) as anthropic_fake, FakeStripe(stripe_config) as stripe_fake, \
+            redirect_stdout(sys.stderr):
+        configure_environment(anthropic_fake.url, stripe_fake.url)
+        rss_before_import = rss_mb()
+        started = time.perf_counter()
+        from app.main import app
+        import_seconds = time.perf_counter() - started
+        create_schema()
+        seed_database()
+
+        with serve_app(app) as base_url:
+            rss_start = rss_mb()
+            results = asyncio.run(run_load(
+                base_url,
+                mix=args.mix,
+                duration=args.duration,
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+                seed=args.seed,
+            ))
+            rss_end = rss_mb()
+
+        report = {
+            "benchmark": "load",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "duration": args.duration,
+                "warmup": args.warmup,
+                "concurrency": args.concurrency,
+                "mix": args.mix,
+                "seed": args.seed,
+                "fake_anthropic": asdict(llm_config),
+                "fake_stripe": asdict(stripe_config),
+            },
+            "results": results,
+            "upstream_requests": {"anthropic": anthropic_fake.requests, "stripe": stripe_fake.requests},
+            "memory": {
+                "rss_before_import_mb": round(rss_before_import, 1),
+                "rss_start_mb": round(rss_start, 1),
+                "rss_end_mb": round(rss_end, 1),
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+            },
+            "app_import_seconds": round(import_seconds, 3),
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Conversation/message index benchmark on a large synthetic dataset
+
+1. Generates N synthetic messages into a fresh SQLite database
+2. Drops the composite indexes from migration 0003 and times the hot
+   queries (load one conversation, a store's recent chats, a store's
+   weekly count)
+3. Recreates the indexes and times the same queries again
+4. Runs the rollups, then up to ten retention batches, and reports archive
+   throughput and size
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_message_indexes --messages 2000000
+    python -m benchmarks.bench_message_indexes --messages 200000 --database sqlite:///./indexes.db
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+COMPOSITE_INDEXES = ("ix_conversations_store_id_started_at", "ix_messages_conversation_id_timestamp")
+
+
+def _timed(func, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {"min_ms": round(timings[0] * 1000, 3), "median_ms": round(timings[len(timings) // 2] * 1000, 3)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2_000_000)
+    parser.add_argument("--stores", type=int, default=200)
+    parser.add_argument("--days", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--retention-days", type=int, default=365)
+    parser.add_argument("--retention-batch", type=int, default=1000)
+    parser.add_argument("--database", help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="shopbot-indexes-")
+    os.environ["DATABASE_URL"] = args.database or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    from sqlalchemy import func
+
+    from app.database import SessionLocal, engine
+    from app.models import Base, Conversation, Message
+    from app.analytics import run_rollups
+    from app.retention import run_retention
+    from benchmarks import synthetic
+
+    Base.metadata.create_all(bind=engine)
+
+    def progress(done, total):
+        print(f"\r  generating messages: {done:,}/{total:,}", end="", file=sys.stderr, flush=True)
+
+    dataset = synthetic.generate(engine, args.messages, stores=args.stores, days=args.days, seed=args.seed, progress=progress)
+    print(file=sys.stderr)
+
+    db = SessionLocal()
+    store_id = dataset["store_ids"][0]
+    week_ago = dataset["end"] - timedelta(days=7)
+    rng = random.Random(args.seed)
+    conversation_ids = [
+        row[0] for row in db.query(Conversation.id).filter(Conversation.store_id == store_id).limit(200)
+    ]
+
+    def load_conversation():
+        conversation_id = rng.choice(conversation_ids)
+        db.query(Message).filter(Message.conversation_id == conversation_id).order_by(Message.timestamp).all()
+        db.expunge_all()
+
+    def recent_conversations():
+        (
+            db.query(Conversation)
+            .filter(Conversation.store_id == store_id)
+            .order_by(Conversation.started_at.desc())
+            .limit(50)
+            .all()
+        )
+        db.expunge_all()
+
+    def weekly_count():
+        (
+            db.query(func.count(Conversation.id))
+            .filter(Conversation.store_id == store_id, Conversation.started_at >= week_ago)
+            .scalar()
+        )
+
+    queries = {
+        "load_conversation_messages": load_conversation,
+        "store_recent_50_conversations": recent_conversations,
+        "store_conversations_last_7_days": weekly_count,
+    }
+
+    def run_all():
+        return {name: _timed(query, args.repeat) for name, query in queries.items()}
+
+    indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+    for name in COMPOSITE_INDEXES:
+        indexes[name].drop(bind=engine)
+    before = run_all()
+    for name in COMPOSITE_INDEXES:
+        indexes[name].create(bind=engine)
+    after = run_all()
+
+    run_rollups(db, now=dataset["end"])  # retention never archives past the rollups
+    start = time.perf_counter()
+    retention = run_retention(
+        db, days=args.retention_days, batch_size=args.retention_batch,
+        archive_dir=os.path.join(workdir, "archive"), max_batches=10, now=dataset["end"],
+    )
+    retention_seconds = time.perf_counter() - start
+    remaining = db.query(func.count(Message.id)).scalar()
+    db.close()
+
+    report = {
+        "benchmark": "conversation_message_indexes",
+        "database": engine.dialect.name,
+        "dataset": {"messages": dataset["messages"], "conversations": dataset["conversations"], "stores": args.stores},
+        "without_indexes": before,
+        "with_indexes": after,
+        "speedup": {
+            name: round(before[name]["median_ms"] / after[name]["median_ms"], 1) if after[name]["median_ms"] else None
+            for name in queries
+        },
+        "retention": {
+            "batches": retention["batches"],
+            "conversations": retention["conversations"],
+            "messages": retention["messages"],
+            "seconds": round(retention_seconds, 2),
+            "messages_per_second": round(retention["messages"] / retention_seconds) if retention_seconds else None,
+            "archive_bytes": retention["bytes"],
+            "messages_remaining": remaining,
+        },
+    }
+    print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
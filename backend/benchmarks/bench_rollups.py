@@ -0,0 +1,162 @@
+"""
+Dashboard rollup benchmark on a large synthetic dataset
+
+1. Generates N synthetic messages (default 10M) into a fresh SQLite database
+2. Times the naive dashboard query that scans messages/conversations
+3. Times the initial rollup backfill
+4. Adds one more hour of traffic and times the incremental rollup
+5. Times the dashboard read from the rollup tables and checks that it
+   matches the naive query
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_rollups --messages 10000000
+    python -m benchmarks.bench_rollups --messages 200000 --database sqlite:///./rollups.db
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+
+def _timed(func, repeat: int = 1):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=10_000_000)
+    parser.add_argument("--stores", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--window-days", type=int, default=30, help="dashboard range")
+    parser.add_argument("--incremental-messages", type=int, default=20_000, help="new traffic for the incremental run")
+    parser.add_argument("--database", help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    database_url = args.database or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='shopbot-rollups-'), 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+
+    from sqlalchemy import case, func
+
+    from app.analytics import run_rollups, store_summary
+    from app.database import SessionLocal, engine
+    from app.models import Base, Conversation, Message
+    from benchmarks import synthetic
+
+    Base.metadata.create_all(bind=engine)
+
+    def progress(done, total):
+        print(f"\r  generating messages: {done:,}/{total:,}", end="", file=sys.stderr, flush=True)
+
+    (dataset, generate_seconds) = _timed(lambda: synthetic.generate(
+        engine, args.messages, stores=args.stores, days=args.days, seed=args.seed, progress=progress,
+    ))
+    print(file=sys.stderr)
+
+    store_id = dataset["store_ids"][0]
+    db = SessionLocal()
+    latest = db.query(func.max(Message.timestamp)).scalar()
+    window_end = (latest + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    window_start = window_end - timedelta(days=args.window_days)
+
+    def naive_dashboard():
+        intents = dict(
+            db.query(Message.intent, func.count(Message.id))
+            .join(Conversation, Conversation.id == Message.conversation_id)
+            .filter(Conversation.store_id == store_id, Message.timestamp >= window_start, Message.timestamp < window_end)
+            .filter(Message.intent.isnot(None))
+            .group_by(Message.intent)
+            .all()
+        )
+        messages, tokens = (
+            db.query(func.count(Message.id), func.coalesce(func.sum(Message.tokens_used), 0))
+            .join(Conversation, Conversation.id == Message.conversation_id)
+            .filter(Conversation.store_id == store_id, Message.timestamp >= window_start, Message.timestamp < window_end)
+            .one()
+        )
+        ended, escalated, rating_sum, rating_count = (
+            db.query(
+                func.count(Conversation.id),
+                func.sum(case((Conversation.status == "escalated", 1), else_=0)),
+                func.coalesce(func.sum(Conversation.rating), 0),
+                func.count(Conversation.rating),
+            )
+            .filter(Conversation.store_id == store_id, Conversation.ended_at >= window_start, Conversation.ended_at < window_end)
+            .one()
+        )
+        return {
+            "messages": messages,
+            "tokens_used": tokens,
+            "escalations": escalated or 0,
+            "conversations_ended": ended,
+            "average_rating": round(rating_sum / rating_count, 2) if rating_count else None,
+            "intents": intents,
+        }
+
+    naive, naive_seconds = _timed(naive_dashboard, repeat=3)
+
+    rollup_now = latest + timedelta(hours=1)
+    backfill, backfill_seconds = _timed(lambda: run_rollups(db, now=rollup_now))
+
+    # One more hour of traffic after the watermark; the incremental run only touches that
+    synthetic.generate(
+        engine, args.incremental_messages, stores=args.stores, days=1 / 24,
+        end=rollup_now + timedelta(hours=1), seed=args.seed + 1,
+    )
+    incremental, incremental_seconds = _timed(lambda: run_rollups(db, now=rollup_now + timedelta(hours=3)))
+
+    # The new hour may fall inside the dashboard window, so re-run the naive query
+    naive = naive_dashboard()
+    summary, rollup_read_seconds = _timed(
+        lambda: store_summary(db, store_id, window_start, window_end, "day"), repeat=20
+    )
+    totals = summary["totals"]
+    rollup_view = {
+        "messages": totals["messages"],
+        "tokens_used": totals["tokens_used"],
+        "escalations": totals["escalations"],
+        "conversations_ended": totals["conversations_ended"],
+        "average_rating": totals["average_rating"],
+        "intents": totals["intents"],
+    }
+    db.close()
+
+    report = {
+        "benchmark": "dashboard_rollups",
+        "database": engine.dialect.name,
+        "dataset": {
+            "messages": dataset["messages"],
+            "conversations": dataset["conversations"],
+            "stores": args.stores,
+            "days": args.days,
+            "generate_seconds": round(generate_seconds, 1),
+        },
+        "dashboard_window_days": args.window_days,
+        "naive_dashboard_ms": round(naive_seconds * 1000, 2),
+        "rollup_dashboard_ms": round(rollup_read_seconds * 1000, 3),
+        "speedup": round(naive_seconds / rollup_read_seconds, 1) if rollup_read_seconds else None,
+        "backfill": {"seconds": round(backfill_seconds, 2), **backfill},
+        "incremental": {
+            "new_messages": args.incremental_messages,
+            "seconds": round(incremental_seconds, 3),
+            **incremental,
+        },
+        "rollups_match_naive": rollup_view == naive,
+    }
+    if rollup_view != naive:
+        report["mismatch"] = {"naive": naive, "rollup": rollup_view}
+    print(json.dumps(report, indent=2, default=str))
+    return 0 if rollup_view == naive else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
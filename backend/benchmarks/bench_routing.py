@@ -0,0 +1,207 @@
+"""
+Tiered model routing: latency and cost per route on a replay set
+
+Replays chat turns through the real chat path (route_turn ->
+build_chat_params -> create_message) against the fake Anthropic server,
+once with routing and once with every turn on the full model. The fake
+answers the fast model sooner and streams it faster (see --fast-*/--full-*).
+
+Reports per route: turn count, p50/p95 latency, tokens and cost (from
+PRICES), the totals against the all-full baseline, and the cost of the
+routing decision itself.
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_routing
+    python -m benchmarks.bench_routing --cases replay.jsonl --concurrency 16
+(--cases takes the app.evaluation case format; per-store routing
+overrides come from each case's "routing" field, as in app.evaluation)
+"""
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakeAnthropic, FakeConfig
+from benchmarks.harness import configure_environment, latency_summary
+
+# USD per million tokens (input, output), matched by substring of the model name
+PRICES = {
+    "haiku": (0.80, 4.00),
+    "sonnet": (3.00, 15.00),
+    "opus": (15.00, 75.00),
+}
+
+HISTORY = [
+    {"role": "user", "content": "Hi there"},
+    {"role": "assistant", "content": "Hello! How can I help you today?"},
+]
+REPLAY = [
+    ("hi", 0),
+    ("hello!", 0),
+    ("thanks so much", 2),
+    ("What's your shipping cost?", 0),
+    ("How long does express shipping take?", 0),
+    ("Do you ship to Canada?", 0),
+    ("Where is my order?", 2),
+    ("Can I track order #4821?", 0),
+    ("What's your return policy?", 0),
+    ("Can I exchange a shirt for a bigger size?", 2),
+    ("Do you have the Classic White Tee in XL?", 0),
+    ("What material is the Premium Cotton Polo?", 0),
+    ("Is the Vintage Band Shirt available in XXL?", 2),
+    ("How much is the polo?", 0),
+    ("My shirt arrived damaged and the seams are coming apart. This is unacceptable.", 2),
+    ("I want a refund, I was charged twice for the same order", 0),
+    ("The package never arrived and tracking says delivered three days ago", 4),
+    ("I ordered a medium but got a large, wrong size again. What now?", 2),
+    ("Can I speak to a human please", 4),
+    (
+        "I'm planning to buy shirts for my team of 25 people. Some need S, most need L and XL, "
+        "and a few want XXL. Do you offer bulk discounts, can you print our logo, and how fast "
+        "could you deliver to two different addresses?",
+        0,
+    ),
+    ("Which shirt is best for hot weather? And do they shrink? Also what about colors?", 2),
+    ("ok", 8),
+    ("What's the difference between standard and express shipping, and is next day available on weekends?", 10),
+    ("Do you price match other stores?", 0),
+]
+
+
+def load_cases(path: str | None, repeat: int) -> list[tuple[dict | None, dict | None, list, str]]:
+    """(store_context, routing overrides, history, message) per turn"""
+    if path is None:
+        cases = [(None, None, (HISTORY * 5)[:history], message) for message, history in REPLAY]
+        return cases * repeat
+    cases = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                case = json.loads(line)
+                cases.append((
+                    case.get("store_context"),
+                    case.get("routing"),
+                    case.get("conversation_history") or [],
+                    case["message"],
+                ))
+    return cases
+
+
+def price(model: str, input_tokens: int, output_tokens: int) -> float:
+    for pattern, (input_price, output_price) in PRICES.items():
+        if pattern in model:
+            return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+    return 0.0
+
+
+def replay(cases, routing: bool, concurrency: int) -> dict:
+    from app.routes.chat import DEFAULT_STORE_CONTEXT, build_chat_params, create_message
+    from app.routing import FULL, RoutingRules, route_turn
+
+    def run(case):
+        store_context, overrides, history, message = case
+        store_context = store_context or DEFAULT_STORE_CONTEXT
+        if routing:
+            rules = RoutingRules.from_overrides(overrides)
+            decision = route_turn(message, len(history), rules, log=False)
+            route, model, max_tokens = decision.route, decision.model, decision.max_tokens
+        else:
+            route, model, max_tokens = FULL, None, None
+        params = build_chat_params(store_context, history, message, model=model, max_tokens=max_tokens)
+        start = time.perf_counter()
+        response = create_message("bench_routing", **params)
+        latency = time.perf_counter() - start
+        usage = response.usage
+        return route, params["model"], latency, usage.input_tokens, usage.output_tokens
+
+    per_route = defaultdict(lambda: {"latencies": [], "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0, "models": set()})
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for route, model, latency, input_tokens, output_tokens in pool.map(run, cases):
+            stats = per_route[route]
+            stats["latencies"].append(latency)
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            stats["cost_usd"] += price(model, input_tokens, output_tokens)
+            stats["models"].add(model)
+    elapsed = time.perf_counter() - started
+
+    routes = {}
+    all_latencies = []
+    for route, stats in sorted(per_route.items()):
+        all_latencies.extend(stats["latencies"])
+        routes[route] = {
+            "turns": len(stats["latencies"]),
+            "share": round(len(stats["latencies"]) / len(cases), 3),
+            "models": sorted(stats["models"]),
+            **latency_summary(stats["latencies"]),
+            "input_tokens": stats["input_tokens"],
+            "output_tokens": stats["output_tokens"],
+            "cost_usd": round(stats["cost_usd"], 4),
+        }
+    total_cost = sum(route["cost_usd"] for route in routes.values())
+    return {
+        "seconds": round(elapsed, 2),
+        "routes": routes,
+        "overall": {**latency_summary(all_latencies), "cost_usd": round(total_cost, 4)},
+    }
+
+
+def decision_cost_us(cases, iterations: int = 20_000) -> float:
+    from app.routing import RoutingRules, route_turn
+
+    turns = [(RoutingRules.from_overrides(overrides), history, message) for _, overrides, history, message in cases]
+    start = time.perf_counter()
+    for i in range(iterations):
+        rules, history, message = turns[i % len(turns)]
+        route_turn(message, len(history), rules, log=False)
+    return round((time.perf_counter() - start) / iterations * 1e6, 2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", help="JSONL replay set (default: built-in mix)")
+    parser.add_argument("--repeat", type=int, default=2, help="repeat the built-in mix")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output-tokens", type=int, default=400, help="answer length the fake aims for")
+    parser.add_argument("--full-latency-ms", type=float, default=700)
+    parser.add_argument("--full-tokens-per-second", type=float, default=60)
+    parser.add_argument("--fast-latency-ms", type=float, default=300)
+    parser.add_argument("--fast-tokens-per-second", type=float, default=180)
+    args = parser.parse_args(argv)
+
+    config = FakeConfig(
+        latency_ms=args.full_latency_ms,
+        tokens_per_second=args.full_tokens_per_second,
+        output_tokens=args.output_tokens,
+        models={"haiku": {"latency_ms": args.fast_latency_ms, "tokens_per_second": args.fast_tokens_per_second}},
+    )
+    with FakeAnthropic(config) as fake:
+        configure_environment(fake.url, "http://127.0.0.1:9")
+        from app.config import get_settings
+
+        cases = load_cases(args.cases, args.repeat)
+        routed = replay(cases, routing=True, concurrency=args.concurrency)
+        baseline = replay(cases, routing=False, concurrency=args.concurrency)
+        settings = get_settings()
+
+    report = {
+        "benchmark": "model_routing",
+        "turns": len(cases),
+        "fast_model": settings.fast_ai_model,
+        "full_model": settings.default_ai_model,
+        "decision_us": decision_cost_us(cases),
+        "routed": routed,
+        "all_full_model": baseline,
+        "cost_saving": round(1 - routed["overall"]["cost_usd"] / baseline["overall"]["cost_usd"], 3)
+        if baseline["overall"]["cost_usd"] else None,
+        "p50_latency_saving": round(1 - routed["overall"]["p50_ms"] / baseline["overall"]["p50_ms"], 3),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Microbenchmark: request parsing + response serialization overhead of
+/api/chat/message with long conversation histories
+
+Two apps with the real ChatRequest/ChatResponse models and an endpoint
+that skips the Claude call are driven directly over ASGI (no sockets):
+
+- default: stock APIRouter, stdlib json, response re-validated by FastAPI
+- fast:    FastJSONRoute + FastJSONResponse + model_response()
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_serialization --turns 50 --iterations 2000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from fastapi import APIRouter, FastAPI
+
+from app.responses import FastJSONResponse, FastJSONRoute, model_response, orjson
+from app.routes.chat import ChatRequest, ChatResponse
+from benchmarks.harness import latency_summary
+
+REPLY = "Thanks for reaching out! Standard shipping takes 5-7 business days and is free over $50. " * 3
+
+
+def build_default_app() -> FastAPI:
+    router = APIRouter()
+
+    @router.post("/message", response_model=ChatResponse)
+    async def send_message(request: ChatRequest):
+        return ChatResponse(response=REPLY, conversation_id=None)
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/chat")
+    return app
+
+
+def build_fast_app() -> FastAPI:
+    router = APIRouter(route_class=FastJSONRoute, default_response_class=FastJSONResponse)
+
+    @router.post("/message", response_model=ChatResponse)
+    async def send_message(request: ChatRequest):
+        return model_response(ChatResponse(response=REPLY, conversation_id=None))
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.include_router(router, prefix="/api/chat")
+    return app
+
+
+def build_body(turns: int) -> bytes:
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Question {i}: do you have the Classic White Tee in size {'SMLX'[i % 4]}?"})
+        history.append({"role": "assistant", "content": REPLY})
+    return json.dumps({
+        "message": "And how long does express shipping take?",
+        "conversation_history": history,
+        "store_context": {"store_name": "Bench", "return_policy": "30 days", "shipping_info": "5-7 days"},
+    }).encode()
+
+
+async def call(app: FastAPI, body: bytes) -> tuple[int, bytes]:
+    """Send one POST straight through the ASGI interface"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/api/chat/message", "raw_path": b"/api/chat/message",
+        "root_path": "", "query_string": b"", "server": ("bench", 80), "client": ("127.0.0.1", 1),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    }
+    sent = False
+    status = 0
+    chunks = []
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def measure(app: FastAPI, body: bytes, iterations: int) -> list[float]:
+    status, payload = await call(app, body)
+    assert status == 200, (status, payload)
+    for _ in range(min(200, iterations)):
+        await call(app, body)
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await call(app, body)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50, help="user+assistant pairs in the history")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    body = build_body(args.turns)
+    results = {}
+    for name, app in (("default", build_default_app()), ("fast", build_fast_app())):
+        timings = asyncio.run(measure(app, body, args.iterations))
+        results[name] = {
+            "mean_us": round(sum(timings) / len(timings) * 1e6, 1),
+            **latency_summary(timings),
+        }
+
+    report = {
+        "benchmark": "chat_message_serialization",
+        "turns": args.turns,
+        "request_bytes": len(body),
+        "orjson_available": orjson is not None,
+        "iterations": args.iterations,
+        "results": results,
+        "speedup": round(results["default"]["mean_us"] / results["fast"]["mean_us"], 2),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Startup-time benchmark: how long does `import app.main` take, and where does it go?
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters
+(so nothing is cached in-process), parses the per-module timings and
+reports the median over several runs as JSON.
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_startup --runs 5 --top 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# SDKs that should only load on first use, not at import time
+LAZY_MODULES = ("anthropic", "stripe")
+
+
+def _import_once(target: str, env: dict) -> tuple[float, dict[str, tuple[int, int]]]:
+    """Wall time and {module: (self_us, cumulative_us)} for one cold import"""
+    code = f"import {target}; import sys; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - started
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    modules["__loaded_lazy__"] = result.stdout.strip()
+    return wall, modules
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="app.main", help="module to import")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    args = parser.parse_args(argv)
+
+    # No API keys on purpose: importing must not need them
+    env = {key: value for key, value in os.environ.items() if not key.endswith(("_API_KEY", "_SECRET_KEY"))}
+    env.setdefault("DATABASE_URL", "sqlite:///./startup-bench.db")
+
+    walls = []
+    runs = []
+    for _ in range(args.runs):
+        wall, modules = _import_once(args.target, env)
+        walls.append(wall)
+        runs.append(modules)
+
+    loaded_lazy = runs[-1].pop("__loaded_lazy__")
+    for modules in runs[:-1]:
+        modules.pop("__loaded_lazy__")
+
+    def median(name: str, index: int) -> float:
+        return statistics.median(run[name][index] for run in runs if name in run) / 1000
+
+    names = set().union(*runs)
+    first_party = sorted(
+        (name for name in names if name == "app" or name.startswith("app.")),
+        key=lambda name: -median(name, 1),
+    )
+    slowest = sorted(names, key=lambda name: -median(name, 0))[:args.top]
+
+    report = {
+        "benchmark": "startup",
+        "target": args.target,
+        "runs": args.runs,
+        "interpreter_wall_ms": {
+            "median": round(statistics.median(walls) * 1000, 1),
+            "min": round(min(walls) * 1000, 1),
+        },
+        "target_import_ms": round(median(args.target, 1), 1),
+        "app_modules_cumulative_ms": {name: round(median(name, 1), 1) for name in first_party},
+        "slowest_modules_self_ms": {name: round(median(name, 0), 1) for name in slowest},
+        "lazy_sdks_loaded_at_import": [name for name in loaded_lazy.split(",") if name],
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Widget bootstrap endpoint throughput
+
+Drives GET /api/widget/bootstrap on the full app (all middleware)
+directly over ASGI, against a SQLite database with --stores stores:
+
+- uncached:  cache cleared before every request (DB query, JSON parse
+             and serialization each time - the naive implementation)
+- cache hit: pre-serialized bytes from memory
+- 304:       If-None-Match with the current ETag
+
+Cache hits are also measured on a bare app with only the widget router:
+the difference is the app-wide middleware, not the endpoint.
+
+Reports per-request latency and the page views per hour one worker
+could serve for each case.
+
+Run from the backend/ directory:
+    python -m benchmarks.bench_widget --stores 2000 --iterations 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.harness import latency_summary
+
+
+async def get(app, path: str, query: str, headers: list) -> tuple[int, dict]:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": query.encode(), "server": ("bench", 80), "client": ("127.0.0.1", 1),
+        "headers": headers,
+    }
+    status = 0
+    response_headers = {}
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers.update((k.decode(), v.decode()) for k, v in message["headers"])
+
+    await app(scope, receive, send)
+    return status, response_headers
+
+
+async def measure(app, requests, iterations: int, before=None) -> list[float]:
+    timings = []
+    for i in range(iterations):
+        query, headers, expected = requests[i % len(requests)]
+        if before:
+            before()
+        start = time.perf_counter()
+        status, _ = await get(app, "/api/widget/bootstrap", query, headers)
+        timings.append(time.perf_counter() - start)
+        assert status == expected, (status, expected)
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='shopbot-widget-'), 'bench.db')}"
+
+    from fastapi import FastAPI
+
+    from app.database import engine
+    from app.main import app
+    from app.routes import widget
+    from app.models import Base, Store
+    from app.widget import widget_cache
+    from benchmarks import synthetic
+
+    Base.metadata.create_all(bind=engine)
+    synthetic.generate(engine, 0, stores=args.stores, seed=args.seed)
+    with engine.connect() as conn:
+        stores = conn.execute(Store.__table__.select()).all()
+
+    rng = random.Random(args.seed)
+    sample = [stores[rng.randrange(len(stores))] for _ in range(min(500, len(stores)))]
+    by_key = [(f"key={store.public_key}", [], 200) for store in sample]
+    by_domain = [(f"domain={store.store_domain}", [], 200) for store in sample]
+
+    async def run():
+        results = {}
+        results["uncached"] = await measure(app, by_key, min(args.iterations, 2000), before=widget_cache.clear)
+
+        widget_cache.clear()
+        for query, headers, _ in by_key + by_domain:  # warm the cache
+            await get(app, "/api/widget/bootstrap", query, headers)
+        results["cache_hit_key"] = await measure(app, by_key, args.iterations)
+        results["cache_hit_domain"] = await measure(app, by_domain, args.iterations)
+
+        conditional = []
+        for query, _, _ in by_key:
+            _, headers = await get(app, "/api/widget/bootstrap", query, [])
+            conditional.append((query, [(b"if-none-match", headers["etag"].encode())], 304))
+        results["not_modified_304"] = await measure(app, conditional, args.iterations)
+
+        bare = FastAPI()
+        bare.include_router(widget.router, prefix="/api/widget")
+        results["cache_hit_key_no_middleware"] = await measure(bare, by_key, args.iterations)
+        return results
+
+    results = asyncio.run(run())
+    report = {"benchmark": "widget_bootstrap", "stores": args.stores, "results": {}}
+    for name, timings in results.items():
+        mean = sum(timings) / len(timings)
+        report["results"][name] = {
+            "requests": len(timings),
+            "mean_us": round(mean * 1e6, 1),
+            **latency_summary(timings),
+            "page_views_per_hour_per_worker": int(3600 / mean),
+        }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Compare two bench_load JSON reports
+
+    python -m benchmarks.compare before.json after.json
+"""
+import json
+import sys
+
+
+def _row(name: str, before: dict, after: dict) -> list[str]:
+    rows = [_format(name, "rps", before["throughput_rps"], after["throughput_rps"], higher_is_better=True)]
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        rows.append(_format(name, key, before["latency"].get(key, 0), after["latency"].get(key, 0)))
+    return rows
+
+
+def _format(name: str, metric: str, before: float, after: float, higher_is_better: bool = False) -> str:
+    change = (after - before) / before * 100 if before else 0.0
+    better = change > 0 if higher_is_better else change < 0
+    marker = "" if abs(change) < 5 else ("  better" if better else "  WORSE")
+    return f"{name:<16} {metric:<6} {before:>12.2f} {after:>12.2f} {change:>+8.1f}%{marker}"
+
+
+def main(argv=None) -> int:
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        print(__doc__.strip())
+        return 2
+    with open(argv[0]) as f:
+        before = json.load(f)
+    with open(argv[1]) as f:
+        after = json.load(f)
+
+    print(f"{'scenario':<16} {'metric':<6} {'before':>12} {'after':>12} {'change':>9}")
+    for line in _row("overall", before["results"], after["results"]):
+        print(line)
+    for name, stats in after["results"]["scenarios"].items():
+        if name in before["results"]["scenarios"]:
+            for line in _row(name, before["results"]["scenarios"][name], stats):
+                print(line)
+    print(_format("memory", "rss_mb", before["memory"]["rss_end_mb"], after["memory"]["rss_end_mb"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+In-process fake Anthropic and Stripe servers for offline benchmarks
+
+Both fakes are stdlib HTTP servers running on background threads, so the
+real SDKs talk to them over localhost exactly as they would to the real
+APIs. Latency, token rates and error rates are configurable.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOREM = (
+    "Thanks for reaching out! Our standard shipping takes five to seven business days and "
+    "is free on orders over fifty dollars. Returns are accepted within thirty days of delivery "
+    "as long as the item is unworn with tags attached. Let me know if there is anything else "
+    "I can help you with today."
+).split()
+
+
+@dataclass
+class FakeConfig:
+    """Behaviour knobs shared by the fakes"""
+    latency_ms: float = 0.0  # time to first byte / first token
+    jitter_ms: float = 0.0  # uniform +/- jitter added to latency_ms
+    tokens_per_second: float = 0.0  # 0 streams all tokens at once
+    output_tokens: int = 60
+    error_rate: float = 0.0  # fraction of requests answered with an error
+    seed: int | None = None
+    # Per-model overrides keyed by a substring of the model name, e.g.
+    # {"haiku": {"latency_ms": 150, "tokens_per_second": 150}}
+    models: dict = field(default_factory=dict)
+
+    def for_model(self, model: str | None) -> "FakeConfig":
+        for pattern, overrides in self.models.items():
+            if model and pattern in model:
+                return replace(self, **overrides)
+        return self
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 makes bursts of concurrent clients
+    # wait for a SYN retry (~1s), which would show up as fake latency
+    request_queue_size = 256
+
+
+class _FakeServer:
+    """Runs a handler class on a random localhost port in a daemon thread"""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self, config: FakeConfig | None = None):
+        self.config = config or FakeConfig()
+        self.random = random.Random(self.config.seed)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = _HTTPServer(("127.0.0.1", 0), self.handler_class)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # helpers used by handlers
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def sleep_latency(self, config: FakeConfig | None = None):
+        config = config or self.config
+        delay = config.latency_ms
+        if config.jitter_ms:
+            delay += self.random.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def should_fail(self) -> bool:
+        return self.config.error_rate > 0 and self.random.random() < self.config.error_rate
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("content-length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _AnthropicHandler(_Handler):
+    def do_POST(self):
+        fake = self.fake
+        fake.count_request()
+        request = json.loads(self.read_body() or b"{}")
+        config = fake.config.for_model(request.get("model"))
+        fake.sleep_latency(config)
+
+        if fake.should_fail():
+            self.send_json(529, {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}})
+            return
+
+        input_tokens = _estimate_tokens(request)
+        output_tokens = min(config.output_tokens, request.get("max_tokens", config.output_tokens))
+        words = [LOREM[i % len(LOREM)] for i in range(output_tokens)]
+        message = {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "fake"),
+            "stop_reason": None,
+            "stop_sequence": None,
+        }
+
+        if not request.get("stream"):
+            if config.tokens_per_second:
+                time.sleep(output_tokens / config.tokens_per_second)
+            message.update(
+                content=[{"type": "text", "text": " ".join(words)}],
+                stop_reason="end_turn",
+                usage={"input_tokens": input_tokens, "output_tokens": output_tokens},
+            )
+            self.send_json(200, message)
+            return
+
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        self._event("message_start", {
+            "type": "message_start",
+            "message": {**message, "content": [], "usage": {"input_tokens": input_tokens, "output_tokens": 1}},
+        })
+        self._event("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+        delay = 1 / config.tokens_per_second if config.tokens_per_second else 0
+        for i, word in enumerate(words):
+            if delay and i:
+                time.sleep(delay)
+            text = word if i == 0 else f" {word}"
+            self._event("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}})
+        self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._event("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": output_tokens},
+        })
+        self._event("message_stop", {"type": "message_stop"})
+
+    def _event(self, name: str, data: dict):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+
+def _estimate_tokens(request: dict) -> int:
+    """Rough token count (~4 characters per token) of system prompt + messages"""
+    chars = len(request.get("system") or "")
+    for message in request.get("messages", []):
+        content = message.get("content")
+        chars += len(content) if isinstance(content, str) else len(json.dumps(content))
+    return max(1, chars // 4)
+
+
+class FakeAnthropic(_FakeServer):
+    """Fake of POST /v1/messages, streaming (SSE) and non-streaming"""
+    handler_class = _AnthropicHandler
+
+
+class _StripeHandler(_Handler):
+    PREFIXES = {
+        "/v1/customers": ("customer", "cus"),
+        "/v1/coupons": ("coupon", "coupon"),
+        "/v1/checkout/sessions": ("checkout.session", "cs_test"),
+    }
+
+    def do_POST(self):
+        fake = self.fake
+        fake.count_request()
+        self.read_body()
+        fake.sleep_latency()
+
+        if fake.should_fail():
+            self.send_json(500, {"error": {"type": "api_error", "message": "Injected failure"}})
+            return
+
+        path = self.path.split("?", 1)[0]
+        if path not in self.PREFIXES:
+            self.send_json(404, {"error": {"type": "invalid_request_error", "message": f"Unknown path {path}"}})
+            return
+
+        kind, prefix = self.PREFIXES[path]
+        object_id = f"{prefix}_{uuid.uuid4().hex[:14]}"
+        payload = {"id": object_id, "object": kind, "livemode": False, "created": int(time.time())}
+        if kind == "checkout.session":
+            payload["url"] = f"https://checkout.stripe.test/pay/{object_id}"
+        self.send_json(200, payload)
+
+
+class FakeStripe(_FakeServer):
+    """Fake of the Stripe endpoints the payment routes call"""
+    handler_class = _StripeHandler
@@ -0,0 +1,115 @@
+"""
+Boot the real app against the fakes for offline benchmarks
+
+`configure_environment` must run before anything under `app` is
+imported, because settings are read once and cached.
+"""
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+WEBHOOK_SECRET = "whsec_benchmark"
+
+
+def configure_environment(anthropic_url: str, stripe_url: str, database_url: str | None = None) -> str:
+    """Point settings at the fakes and a throwaway SQLite database"""
+    if database_url is None:
+        db_dir = tempfile.mkdtemp(prefix="shopbot-bench-")
+        database_url = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+
+    os.environ.update({
+        "ANTHROPIC_API_KEY": "sk-ant-benchmark",
+        "ANTHROPIC_BASE_URL": anthropic_url,
+        "STRIPE_SECRET_KEY": "sk_test_benchmark",
+        "STRIPE_PUBLISHABLE_KEY": "pk_test_benchmark",
+        "STRIPE_WEBHOOK_SECRET": WEBHOOK_SECRET,
+        "STRIPE_PRICE_ID_BASIC": "price_benchmark",
+        "SECRET_KEY": "benchmark-secret",
+        "DATABASE_URL": database_url,
+        "ENVIRONMENT": "benchmark",
+        "DEBUG": "false",
+        # Every simulated shopper comes from 127.0.0.1 and asks the same few
+        # questions; keep the prefilter's content checks, not its flood limit
+        "PREFILTER_REPEAT_LIMIT": "1000000000",
+    })
+
+    import stripe
+    stripe.api_base = stripe_url
+    return database_url
+
+
+def create_schema():
+    """Create all tables directly (benchmarks do not run migrations)"""
+    from app.database import engine
+    from app.models import Base
+    Base.metadata.create_all(bind=engine)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve_app(app, port: int | None = None):
+    """Run the ASGI app with uvicorn on a background thread"""
+    import uvicorn
+
+    port = port or free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+    server = uvicorn.Server(config)
+    server.install_signal_handlers = lambda: None
+    thread = threading.Thread(target=server.run, name="uvicorn", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    import resource
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    """p50/p95/p99/max in milliseconds"""
+    values = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
@@ -0,0 +1,190 @@
+"""
+Async load generator with a weighted mix of realistic API traffic
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import httpx
+
+from benchmarks.harness import WEBHOOK_SECRET, latency_summary
+
+PROMO_CODE = "BENCH50"
+
+SHOPPER_QUESTIONS = [
+    "hi",
+    "What's your shipping cost?",
+    "Do you ship internationally?",
+    "What is your return policy?",
+    "Where is my order #10234? It was supposed to arrive yesterday.",
+    "Do you have the Classic White Tee in XL?",
+    "My shirt arrived with a hole in it and I'm really disappointed. What can you do?",
+    "Can I exchange a medium polo for a large one?",
+    "Which shirt would you recommend for a summer wedding?",
+    "How long does express shipping take?",
+]
+
+STORE_CONTEXT = {
+    "store_name": "Benchmark Apparel",
+    "return_policy": "30-day returns, free return shipping over $50",
+    "shipping_info": "Standard 5-7 days ($5.99), Express 2-3 days ($12.99). Free over $50.",
+}
+
+# Default traffic mix (relative weights)
+DEFAULT_MIX = {
+    "chat_turn": 40,
+    "demo": 20,
+    "validate_promo": 20,
+    "webhook": 10,
+    "register": 5,
+    "checkout": 5,
+}
+
+
+def _history(rng: random.Random, turns: int) -> list[dict]:
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": rng.choice(SHOPPER_QUESTIONS)})
+        history.append({"role": "assistant", "content": "Happy to help with that! " * (1 + i % 3)})
+    return history
+
+
+def _sign_webhook(payload: bytes) -> str:
+    timestamp = int(time.time())
+    signed = f"{timestamp}.".encode() + payload
+    signature = hmac.new(WEBHOOK_SECRET.encode(), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+async def chat_turn(client: httpx.AsyncClient, rng: random.Random):
+    return await client.post("/api/chat/message", json={
+        "message": rng.choice(SHOPPER_QUESTIONS),
+        "conversation_history": _history(rng, rng.randint(0, 6)),
+        "store_context": STORE_CONTEXT,
+    })
+
+
+async def demo(client: httpx.AsyncClient, rng: random.Random):
+    return await client.post("/api/chat/demo", json={
+        "message": rng.choice(SHOPPER_QUESTIONS),
+        "conversation_history": [],
+    })
+
+
+async def validate_promo(client: httpx.AsyncClient, rng: random.Random):
+    return await client.post("/api/payment/validate-promo", json={"code": PROMO_CODE.lower()})
+
+
+async def register(client: httpx.AsyncClient, rng: random.Random):
+    return await client.post("/api/payment/register", json={
+        "email": f"bench-{uuid.uuid4().hex[:12]}@example.com",
+        "password": "benchmark-password",
+        "full_name": "Bench Marker",
+        "company_name": "Benchmark Apparel",
+    })
+
+
+async def webhook(client: httpx.AsyncClient, rng: random.Random):
+    now = int(time.time())
+    payload = json.dumps({
+        "id": f"evt_{uuid.uuid4().hex[:14]}",
+        "object": "event",
+        "type": "customer.subscription.updated",
+        "data": {"object": {
+            "id": f"sub_{rng.randint(1, 1000)}",
+            "object": "subscription",
+            "status": "active",
+            "current_period_start": now,
+            "current_period_end": now + 30 * 86400,
+        }},
+    }).encode()
+    return await client.post(
+        "/api/payment/webhook",
+        content=payload,
+        headers={"stripe-signature": _sign_webhook(payload), "content-type": "application/json"},
+    )
+
+
+async def checkout(client: httpx.AsyncClient, rng: random.Random):
+    return await client.post("/api/payment/create-checkout-session", json={"promo_code": PROMO_CODE})
+
+
+SCENARIOS = {
+    "chat_turn": chat_turn,
+    "demo": demo,
+    "validate_promo": validate_promo,
+    "webhook": webhook,
+    "register": register,
+    "checkout": checkout,
+}
+
+
+async def run_load(
+    base_url: str,
+    mix: dict[str, float],
+    duration: float,
+    concurrency: int,
+    warmup: float = 0.0,
+    seed: int = 0,
+    timeout: float = 60.0,
+) -> dict:
+    """
+    Drive `concurrency` workers for `warmup + duration` seconds
+
+    Requests that finish during warmup are not recorded.
+    """
+    names = [name for name in mix if mix[name] > 0]
+    weights = [mix[name] for name in names]
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    failures = Counter()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        measure_from = start + warmup
+        deadline = measure_from + duration
+
+        async def worker(worker_id: int):
+            rng = random.Random(seed * 1000 + worker_id)
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                began = time.perf_counter()
+                try:
+                    response = await SCENARIOS[name](client, rng)
+                    status = str(response.status_code)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                finished = time.perf_counter()
+                if began >= measure_from and finished <= deadline:
+                    latencies[name].append(finished - began)
+                    statuses[name][status] += 1
+                    if not status.startswith("2"):
+                        failures[name] += 1
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = min(time.perf_counter(), deadline) - measure_from
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    total = len(all_latencies)
+    return {
+        "requests": total,
+        "errors": sum(failures.values()),
+        "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency": latency_summary(all_latencies),
+        "scenarios": {
+            name: {
+                "requests": len(latencies[name]),
+                "errors": failures[name],
+                "throughput_rps": round(len(latencies[name]) / elapsed, 2) if elapsed > 0 else 0.0,
+                "status_codes": dict(statuses[name]),
+                "latency": latency_summary(latencies[name]),
+            }
+            for name in names
+        },
+    }
@@ -0,0 +1,110 @@
+"""
+Synthetic stores, conversations and messages for database benchmarks
+
+Rows are bulk-inserted with Core executemany in chunks, so tens of
+millions of messages can be generated without holding them in memory.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models import Conversation, Message, Store, User
+
+INTENTS = ["order_tracking", "product_question", "shipping_question", "return_question", "complaint", "general_inquiry"]
+STATUSES = ["resolved"] * 7 + ["escalated"] * 1 + ["active"] * 2
+USER_TEXT = "Hi, where is my order? It was supposed to arrive on Tuesday and the tracking page has not updated."
+ASSISTANT_TEXT = (
+    "I'm sorry for the delay! Could you share your order number so I can look up the latest tracking "
+    "information for you? Standard shipping usually takes 5-7 business days."
+)
+
+
+def _id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate(
+    engine,
+    messages: int,
+    stores: int = 100,
+    days: int = 90,
+    messages_per_conversation: int = 8,
+    end: datetime | None = None,
+    seed: int = 0,
+    chunk_size: int = 50_000,
+    progress=None,
+) -> dict:
+    """
+    Insert `messages` messages spread over `stores` stores and the last `days` days
+
+    Returns ids that benchmarks need (store ids, time range).
+    """
+    rng = random.Random(seed)
+    end = end or datetime.utcnow().replace(microsecond=0)
+    start = end - timedelta(days=days)
+    span = (end - start).total_seconds()
+
+    user_id = _id(rng)
+    store_ids = [_id(rng) for _ in range(stores)]
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": user_id, "email": f"synthetic-{user_id[:8]}@example.com", "password_hash": "x",
+            "created_at": start, "updated_at": start,
+        }])
+        conn.execute(insert(Store), [{
+            "id": store_id, "user_id": user_id, "shopify_store_url": f"store-{i}.myshopify.com",
+            "store_name": f"Store {i}", "store_domain": f"store-{i}.example.com",
+            "created_at": start, "updated_at": start,
+        } for i, store_id in enumerate(store_ids)])
+
+    written = 0
+    conversations = 0
+    while written < messages:
+        conversation_rows = []
+        message_rows = []
+        while len(message_rows) < chunk_size and written + len(message_rows) < messages:
+            conversation_id = _id(rng)
+            started = start + timedelta(seconds=rng.random() * span)
+            count = min(max(1, int(rng.gauss(messages_per_conversation, 3))), messages - written - len(message_rows))
+            status = rng.choice(STATUSES)
+            ended = started + timedelta(seconds=60 * count) if status != "active" else None
+            conversation_rows.append({
+                "id": conversation_id,
+                "user_id": user_id,
+                "store_id": rng.choice(store_ids),
+                "customer_ip": f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}",
+                "status": status,
+                "rating": rng.choice([None, None, 3, 4, 5, 5, 1]) if ended else None,
+                "started_at": started,
+                "ended_at": ended,
+            })
+            for i in range(count):
+                is_user = i % 2 == 0
+                message_rows.append({
+                    "id": _id(rng),
+                    "conversation_id": conversation_id,
+                    "role": "user" if is_user else "assistant",
+                    "content": USER_TEXT if is_user else ASSISTANT_TEXT,
+                    "model_used": None if is_user else "claude-sonnet-4-20250514",
+                    "tokens_used": None if is_user else rng.randint(40, 400),
+                    "intent": rng.choice(INTENTS) if is_user else None,
+                    "timestamp": started + timedelta(seconds=60 * i),
+                })
+        with engine.begin() as conn:
+            conn.execute(insert(Conversation), conversation_rows)
+            conn.execute(insert(Message), message_rows)
+        written += len(message_rows)
+        conversations += len(conversation_rows)
+        if progress:
+            progress(written, messages)
+
+    return {
+        "user_id": user_id,
+        "store_ids": store_ids,
+        "start": start,
+        "end": end + timedelta(seconds=60 * messages_per_conversation * 4),
+        "conversations": conversations,
+        "messages": written,
+    }